@@ -0,0 +1 @@
+"""Benchmarks dos caminhos críticos de treino e renderização (python -m benchmarks.run)"""
@@ -0,0 +1,98 @@
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+from .suite import BENCHMARKS
+
+
+def run(names, scale, repeat):
+    results = {}
+    for name in names:
+        spec = BENCHMARKS[name]
+        values = []
+        for _ in range(repeat):
+            # Os benchmarks chamam código que imprime progresso; só o resultado interessa
+            with contextlib.redirect_stdout(io.StringIO()):
+                values.append(spec['fn'](scale))
+        best = max(values) if spec['higher_is_better'] else min(values)
+        results[name] = {
+            'value': best,
+            'unit': spec['unit'],
+            'higher_is_better': spec['higher_is_better'],
+            'runs': values,
+        }
+        print(f"{name:28s} {best:14.1f} {spec['unit']}")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Lista de regressões: piora relativa maior que threshold em relação ao baseline"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get('results', {}).get(name)
+        if base is None or not base['value']:
+            continue
+        if result['higher_is_better']:
+            change = (base['value'] - result['value']) / base['value']
+        else:
+            change = (result['value'] - base['value']) / base['value']
+        status = "REGRESSÃO" if change > threshold else "ok"
+        print(f"{name:28s} {base['value']:14.1f} -> {result['value']:14.1f} "
+              f"({-change * 100:+.1f}%) {status}")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de treino e renderização")
+    parser.add_argument("names", nargs="*", help="Benchmarks a rodar (padrão: todos)")
+    parser.add_argument("--output", default="bench_results.json", help="Arquivo JSON de saída")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Piora relativa tolerada antes de acusar regressão (0.10 = 10%%)")
+    parser.add_argument("--scale", type=int, default=1, help="Multiplica o tamanho de cada benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições (vale a melhor)")
+    parser.add_argument("--list", action="store_true", help="Lista os benchmarks disponíveis")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, spec in BENCHMARKS.items():
+            print(f"{name:28s} {spec['unit']}")
+        return 0
+
+    names = args.names or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Benchmarks desconhecidos: {', '.join(unknown)}")
+
+    results = run(names, args.scale, args.repeat)
+    report = {
+        'meta': {
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'scale': args.scale,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Resultados salvos em {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"Regressões: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
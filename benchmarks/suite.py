@@ -0,0 +1,266 @@
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+import numpy as np
+
+SEED = 1234
+BENCHMARKS = {}
+
+
+def benchmark(name, unit, higher_is_better=True):
+    """Registra uma função de benchmark; ela retorna o valor medido (na unidade dada)"""
+    def register(fn):
+        BENCHMARKS[name] = {'fn': fn, 'unit': unit, 'higher_is_better': higher_is_better}
+        return fn
+    return register
+
+
+def _seed():
+    random.seed(SEED)
+    np.random.seed(SEED)
+
+
+def _rate(fn, iterations):
+    """Execuções por segundo de fn() repetida iterations vezes"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - start)
+
+
+@contextmanager
+def _in_temp_dir():
+    # save_game/load_game usam o diretório "save" relativo ao diretório atual
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            yield tmp
+        finally:
+            os.chdir(cwd)
+
+
+def _game():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from game.game import Game
+    return Game(metrics=False)
+
+
+# --- Micro benchmarks ---------------------------------------------------------
+
+@benchmark("roadmap_generation", "mapas/s")
+def bench_roadmap_generation(scale):
+    from game.roadmap import RoadMap
+    seeds = iter(range(SEED, SEED + 1000000))
+    return _rate(lambda: RoadMap(seed=next(seeds)), 2000 * scale)
+
+
+@benchmark("dataset_load_maze", "mapas/s")
+def bench_dataset_load(scale):
+    from game.maze_dataset import MazeDataset, build_dataset
+    with _in_temp_dir():
+        build_dataset("mazes.dataset", count=2000, seed=SEED, workers=1)
+        dataset = MazeDataset("mazes.dataset")
+        indices = iter(range(1000000))
+        return _rate(lambda: dataset.roadmap(next(indices) % len(dataset)), 2000 * scale)
+
+
+@benchmark("move_agent", "passos/s")
+def bench_move_agent(scale):
+    from game.environment import Environment
+    _seed()
+    env = Environment()
+    env.reset()
+    # Vai e volta na horizontal: sempre dentro do mapa
+    actions = [1, 3] * (50000 * scale)
+    move = env.move_agent
+    start = time.perf_counter()
+    for action in actions:
+        move(action)
+        env.roadmap.current_checkpoint = 0
+    return len(actions) / (time.perf_counter() - start)
+
+
+def _bench_agent(storage, scale):
+    from game.agent import QLearningAgent
+    _seed()
+    agent = QLearningAgent(storage=storage)
+    agent.epsilon = 0.1
+    states = [(random.randint(-5, 5), random.randint(-5, 5)) for _ in range(1024)]
+    iterations = 100000 * scale
+    start = time.perf_counter()
+    for i in range(iterations):
+        state = states[i & 1023]
+        next_state = states[(i + 1) & 1023]
+        action = agent.choose_action(state)
+        agent.learn(state, action, -0.1, next_state)
+    return iterations / (time.perf_counter() - start)
+
+
+@benchmark("agent_act_learn_dict", "passos/s")
+def bench_agent_dict(scale):
+    return _bench_agent("dict", scale)
+
+
+@benchmark("agent_act_learn_dense", "passos/s")
+def bench_agent_dense(scale):
+    return _bench_agent("dense", scale)
+
+
+@benchmark("reward_stats_add", "episódios/s")
+def bench_reward_stats(scale):
+    from game.stats import RewardStats
+    stats = RewardStats()
+    rewards = np.random.default_rng(SEED).normal(size=100000 * scale).tolist()
+    add = stats.add
+    start = time.perf_counter()
+    for reward in rewards:
+        add(reward)
+    return len(rewards) / (time.perf_counter() - start)
+
+
+@benchmark("inference_act_batch", "agentes/s")
+def bench_inference(scale):
+    from game.inference import FrozenPolicy
+    rng = np.random.default_rng(SEED)
+    policy = FrozenPolicy(rng.normal(size=(121, 4)))
+    agents = 100000
+    positions = rng.integers(0, 30, size=(agents, 2))
+    checkpoints = rng.integers(0, 30, size=(agents, 2))
+    out = np.empty(agents, dtype=np.uint8)
+    batches = 50 * scale
+    start = time.perf_counter()
+    for _ in range(batches):
+        policy.act_batch(positions, checkpoints, out=out)
+    return agents * batches / (time.perf_counter() - start)
+
+
+# --- Macro benchmarks ---------------------------------------------------------
+
+@benchmark("headless_episodes", "episódios/s")
+def bench_headless_episodes(scale):
+    from game.headless import HeadlessTrainer
+    _seed()
+    trainer = HeadlessTrainer()
+    trainer.agent.rng = np.random.default_rng(SEED)
+    episodes = 2000 * scale
+    start = time.perf_counter()
+    for _ in range(episodes):
+        trainer.run_episode()
+    return episodes / (time.perf_counter() - start)
+
+
+@benchmark("headless_episodes_fused", "episódios/s")
+def bench_headless_episodes_fused(scale):
+    from game.headless import HeadlessTrainer
+    _seed()
+    trainer = HeadlessTrainer(fused=True, seed=SEED)
+    episodes = 2000 * scale
+    start = time.perf_counter()
+    for _ in range(episodes):
+        trainer.run_episode()
+    return episodes / (time.perf_counter() - start)
+
+
+@benchmark("render_fps", "quadros/s")
+def bench_render_fps(scale):
+    _seed()
+    game = _game()
+    try:
+        game.reset()
+        game.render()
+        frames = 2000 * scale
+        start = time.perf_counter()
+        for i in range(frames):
+            game.agent_pos = (i % 30, (i // 30) % 30)
+            game.render()
+        return frames / (time.perf_counter() - start)
+    finally:
+        game.close()
+
+
+@benchmark("roadmap_draw_fps", "quadros/s")
+def bench_roadmap_draw(scale):
+    import pygame
+    from game.roadmap import RoadMap
+    from game.constants import WIDTH, HEIGHT
+    _seed()
+    game = _game()
+    try:
+        game.open_display()  # Inicializa o pygame (fontes dos checkpoints)
+        surface = pygame.Surface((WIDTH, HEIGHT))
+        roadmap = RoadMap(seed=SEED)
+        frames = 500 * scale
+        start = time.perf_counter()
+        for _ in range(frames):
+            roadmap.draw(surface)
+        return frames / (time.perf_counter() - start)
+    finally:
+        game.close()
+
+
+def _bench_save_load(history, scale):
+    _seed()
+    game = _game()
+    try:
+        with _in_temp_dir():
+            rewards = np.random.default_rng(SEED).normal(size=history)
+            game.reward_stats.load(rewards, rewards)
+            repeats = max(1, 5 * scale)
+            start = time.perf_counter()
+            for _ in range(repeats):
+                game._history_saved = None  # Regrava o histórico inteiro (pior caso)
+                game.save_game()
+                game.load_game()
+            return (time.perf_counter() - start) / repeats * 1000
+    finally:
+        game.close()
+
+
+for _history in (1000, 100000, 1000000):
+    benchmark(f"save_load_{_history}", "ms", higher_is_better=False)(
+        lambda scale, history=_history: _bench_save_load(history, scale))
+
+
+# --- Inicialização --------------------------------------------------------------
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _startup_ms(code, repeats):
+    """Melhor tempo (ms) de um interpretador novo executando code, incluindo a própria inicialização"""
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, SDL_VIDEODRIVER=os.environ.get("SDL_VIDEODRIVER", "dummy"))
+    best = float('inf')
+    with _in_temp_dir() as tmp:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], cwd=tmp, env=env, check=True,
+                           stdout=subprocess.DEVNULL)
+            best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+@benchmark("startup_python", "ms", higher_is_better=False)
+def bench_startup_python(scale):
+    # Referência: interpretador vazio (o que sobra dos outros startups é custo do jogo)
+    return _startup_ms("pass", 3 * scale)
+
+
+@benchmark("startup_import_game", "ms", higher_is_better=False)
+def bench_startup_import(scale):
+    return _startup_ms("import game.game", 3 * scale)
+
+
+@benchmark("startup_first_step", "ms", higher_is_better=False)
+def bench_startup_first_step(scale):
+    # Do início do processo ao primeiro passo de treino (sem janela nem gráfico até serem usados)
+    return _startup_ms("from game.game import Game\n"
+                       "game = Game()\n"
+                       "state = game.reset()\n"
+                       "action = game.agent.choose_action(state)\n"
+                       "game.agent.learn(state, action, *game.move_agent(action)[:1], game.get_state())\n",
+                       3 * scale)
@@ -2,84 +2,243 @@ import random
 import numpy as np
 from collections import defaultdict
 from .constants import *
-import os
-import pickle
 from pathlib import Path
+from .checkpoint import save_model_state, read_checkpoint, migrate_legacy
+
+# Espaço de estados de get_state_key: (dx, dy) limitados a [-5, 5]
+STATE_LIMIT = 5
+STATE_SIDE = 2 * STATE_LIMIT + 1
+NUM_STATES = STATE_SIDE * STATE_SIDE
+NUM_ACTIONS = 4
+
+
+def default_q_values():
+    return np.zeros(NUM_ACTIONS)
+
+
+def state_to_index(state):
+    """Converte o estado (dx, dy) no índice da linha da Q-table densa"""
+    return (state[0] + STATE_LIMIT) * STATE_SIDE + (state[1] + STATE_LIMIT)
+
+
+def index_to_state(index):
+    dx, dy = divmod(int(index), STATE_SIDE)
+    return (dx - STATE_LIMIT, dy - STATE_LIMIT)
+
+
+def states_to_indices(states):
+    """Versão vetorizada de state_to_index para um array (N, 2) de estados"""
+    states = np.asarray(states)
+    return (states[:, 0] + STATE_LIMIT) * STATE_SIDE + (states[:, 1] + STATE_LIMIT)
+
 
 class QLearningAgent:
-    def __init__(self):
-        def default_q_values():
-            return np.zeros(4)
-        
-        self.q_table = defaultdict(default_q_values)  # 4 ações possíveis
-        self.alpha = ALPHA  # Taxa de aprendizado
-        self.gamma = GAMMA  # Fator de desconto
-        self.epsilon = EPSILON_START  # Taxa de exploração
-        self.epsilon_min = EPSILON_MIN
-        self.epsilon_decay = EPSILON_DECAY
+    def __init__(self, storage="dict", alpha=ALPHA, gamma=GAMMA, epsilon=EPSILON_START,
+                 epsilon_min=EPSILON_MIN, epsilon_decay=EPSILON_DECAY):
+        """
+        storage="dict": Q-table em defaultdict (formato original).
+        storage="dense": Q-table pré-alocada em um array contíguo (NUM_STATES, 4),
+        acessada por índice de estado, sem alocações por passo.
+        Os hiperparâmetros padrão vêm de constants.py (ver game/sweep.py para ajustá-los).
+        """
+        if storage not in ("dict", "dense"):
+            raise ValueError(f"Armazenamento desconhecido: {storage}")
+        self.storage = storage
+        self.dense = storage == "dense"
+        if self.dense:
+            self.set_q_array(np.zeros((NUM_STATES, NUM_ACTIONS)))
+        else:
+            self.q_table = defaultdict(default_q_values)  # 4 ações possíveis
+        self.alpha = alpha  # Taxa de aprendizado
+        self.gamma = gamma  # Fator de desconto
+        self.epsilon = epsilon  # Taxa de exploração
+        self.epsilon_min = epsilon_min
+        self.epsilon_decay = epsilon_decay
         self.actions = [0, 1, 2, 3]  # 0: cima, 1: direita, 2: baixo, 3: esquerda
-        
-    def save_model(self, filename="q_learning_model.pkl"):
-        """Salva o modelo Q-table em um arquivo"""
-        save_dir = Path("save")
-        save_dir.mkdir(exist_ok=True)
-        
-        # Converte o defaultdict para um dict normal antes de salvar
-        q_table_dict = dict(self.q_table)
-        filepath = save_dir / filename
-        with open(filepath, 'wb') as f:
-            pickle.dump({
-                'q_table': q_table_dict,
-                'alpha': self.alpha,
-                'gamma': self.gamma,
-                'epsilon': self.epsilon,
-                'epsilon_min': self.epsilon_min,
-                'epsilon_decay': self.epsilon_decay
-            }, f)
+        self.rng = np.random.default_rng()  # Sorteios vetorizados (choose_actions)
+
+    def set_q_array(self, q_values):
+        """Define o array (NUM_STATES, 4) usado pelo modo denso"""
+        self.q_values = q_values
+        # Visão plana com acesso escalar barato (floats Python, escreve no próprio array)
+        self._q = memoryview(q_values.reshape(-1))
+
+    def q_array(self):
+        """Q-table como array denso (NUM_STATES, 4); no modo denso é o próprio array"""
+        if self.dense:
+            return self.q_values
+        q_values = np.zeros((NUM_STATES, NUM_ACTIONS))
+        for state, values in self.q_table.items():
+            if abs(state[0]) <= STATE_LIMIT and abs(state[1]) <= STATE_LIMIT:
+                q_values[state_to_index(state)] = values
+        return q_values
+
+    def load_q_array(self, q_values):
+        """Copia um array denso (NUM_STATES, 4) para a Q-table, em qualquer modo"""
+        if self.dense:
+            self.q_values[:] = q_values
+            return
+        self.q_table = defaultdict(default_q_values)
+        for i in np.flatnonzero(np.asarray(q_values).any(axis=1)):
+            self.q_table[index_to_state(i)] = np.array(q_values[i], dtype=np.float64)
+
+    def get_q_table(self):
+        """Q-table no formato de dicionário {(dx, dy): array(4)} usado nos arquivos salvos"""
+        if not self.dense:
+            return dict(self.q_table)
+        return {index_to_state(i): self.q_values[i].copy()
+                for i in np.flatnonzero(self.q_values.any(axis=1))}
+
+    def set_q_table(self, q_table):
+        """Carrega uma Q-table no formato de dicionário, em qualquer modo de armazenamento"""
+        if not self.dense:
+            self.q_table = defaultdict(default_q_values, q_table)
+            return
+        self.q_values.fill(0.0)
+        for state, values in q_table.items():
+            if abs(state[0]) <= STATE_LIMIT and abs(state[1]) <= STATE_LIMIT:
+                self.q_values[state_to_index(state)] = values
+
+    def save_model(self, filename="q_learning_model.ckpt"):
+        """Salva o modelo Q-table em um arquivo (checkpoint binário, escrita atômica)"""
+        filepath = Path("save") / filename
+        save_model_state(filepath, self)
         print(f"Modelo salvo em {filepath}")
-    
-    def load_model(self, filename="q_learning_model.pkl"):
-        """Carrega o modelo Q-table de um arquivo"""
+
+    def load_model(self, filename="q_learning_model.ckpt"):
+        """Carrega o modelo Q-table de um arquivo (migra o .pkl antigo se necessário)"""
         filepath = Path("save") / filename
+        if not filepath.exists() and filepath.with_suffix(".pkl").exists():
+            migrate_legacy(filepath.parent)
         if filepath.exists():
-            with open(filepath, 'rb') as f:
-                data = pickle.load(f)
-                def default_q_values():
-                    return np.zeros(4)
-                
-                self.q_table = defaultdict(default_q_values, data['q_table'])
-                self.alpha = data.get('alpha', ALPHA)
-                self.gamma = data.get('gamma', GAMMA)
-                self.epsilon = data.get('epsilon', EPSILON_START)
-                self.epsilon_min = data.get('epsilon_min', EPSILON_MIN)
-                self.epsilon_decay = data.get('epsilon_decay', EPSILON_DECAY)
-                
+            meta, arrays = read_checkpoint(filepath)
+            self.apply_checkpoint(meta['agent'], arrays['q_table'])
             print(f"Modelo carregado de {filepath}")
             return True
         print(f"Arquivo {filepath} não encontrado")
         return False
-    
+
+    def apply_checkpoint(self, params, q_values):
+        """Restaura hiperparâmetros e Q-table lidos de um checkpoint"""
+        self.load_q_array(q_values)
+        self.alpha = params.get('alpha', ALPHA)
+        self.gamma = params.get('gamma', GAMMA)
+        self.epsilon = params.get('epsilon', EPSILON_START)
+        self.epsilon_min = params.get('epsilon_min', EPSILON_MIN)
+        self.epsilon_decay = params.get('epsilon_decay', EPSILON_DECAY)
+
     def get_state_key(self, agent_pos, checkpoint_pos, roadmap):
         # Simplifica o estado para (dx, dy) em relação ao checkpoint
         dx = checkpoint_pos[1] - agent_pos[1]
         dy = checkpoint_pos[0] - agent_pos[0]
-        
+
         # Discretiza a diferença (reduz o espaço de estados)
         dx = max(min(dx, 5), -5)
         dy = max(min(dy, 5), -5)
-        
+
         return (dx, dy)
-    
+
     def choose_action(self, state):
+        if self.dense:
+            return self.choose_action_index(state_to_index(state))
         if random.random() < self.epsilon:
             return random.choice(self.actions)  # Exploração
         return np.argmax(self.q_table[state])  # Exploração
-    
+
+    def choose_action_index(self, index):
+        """choose_action no modo denso, recebendo o índice do estado"""
+        if random.random() < self.epsilon:
+            return random.choice(self.actions)  # Exploração
+        return self.greedy_action_index(index)
+
+    def greedy_action_index(self, index):
+        """Ação gulosa no modo denso (empate: primeira ação, como np.argmax)"""
+        # Argmax das 4 ações em aritmética simples
+        q = self._q
+        base = index * NUM_ACTIONS
+        best, best_q = 0, q[base]
+        value = q[base + 1]
+        if value > best_q:
+            best, best_q = 1, value
+        value = q[base + 2]
+        if value > best_q:
+            best, best_q = 2, value
+        if q[base + 3] > best_q:
+            best = 3
+        return best
+
     def learn(self, state, action, reward, next_state):
+        if self.dense:
+            self.learn_index(state_to_index(state), action, reward, state_to_index(next_state))
+            return
         best_next_action = np.argmax(self.q_table[next_state])
         td_target = reward + self.gamma * self.q_table[next_state][best_next_action]
         td_error = td_target - self.q_table[state][action]
         self.q_table[state][action] += self.alpha * td_error
-    
+
+    def learn_index(self, index, action, reward, next_index):
+        """learn no modo denso, recebendo os índices dos estados"""
+        q = self._q
+        base = next_index * NUM_ACTIONS
+        best_next = max(q[base], q[base + 1], q[base + 2], q[base + 3])
+        td_target = reward + self.gamma * best_next
+        i = index * NUM_ACTIONS + action
+        td_error = td_target - q[i]
+        q[i] += self.alpha * td_error
+
+    def choose_actions(self, states):
+        """Versão em lote de choose_action para um array (N, 2) de estados (dx, dy)"""
+        n = len(states)
+        actions = self.rng.integers(0, 4, size=n)
+        greedy = np.flatnonzero(self.rng.random(n) >= self.epsilon)
+        if self.dense:
+            indices = states_to_indices(states)
+            actions[greedy] = self.q_values[indices[greedy]].argmax(axis=1)
+            return actions
+        for i in greedy:
+            actions[i] = np.argmax(self.q_table[(int(states[i, 0]), int(states[i, 1]))])
+        return actions
+
+    def learn_batch(self, states, actions, rewards, next_states, average=True):
+        """
+        Aplica learn a um lote de transições (N, 2) de estados. Com poucos pares
+        (estado, ação) possíveis, lotes grandes repetem o mesmo par muitas vezes: por
+        padrão cada par recebe a média dos erros (ver learn_batch_index).
+        """
+        if self.dense:
+            self.learn_batch_index(states_to_indices(states), actions, rewards,
+                                   states_to_indices(next_states), average=average)
+            return
+        for i in range(len(actions)):
+            self.learn((int(states[i, 0]), int(states[i, 1])), int(actions[i]), float(rewards[i]),
+                       (int(next_states[i, 0]), int(next_states[i, 1])))
+
+    def learn_batch_index(self, indices, actions, rewards, next_indices, dones=None, average=False):
+        """
+        Atualização TD vetorizada no modo denso. Todos os alvos são calculados com a
+        tabela anterior ao lote.
+        dones: transições terminais não usam o valor do próximo estado (aceita também
+        probabilidades de término, como as do modelo do Dyna).
+        average=True: pares (estado, ação) repetidos recebem a média dos erros.
+        average=False: índices repetidos somam seus erros (np.add.at), ou seja, um par que
+        aparece k vezes dá um passo de k * alpha. Só é seguro em lotes pequenos ou sem
+        repetição: com os 484 pares do estado limitado, lotes de centenas de transições
+        fazem a Q-table divergir.
+        """
+        q = self.q_values
+        best_next = q[next_indices].max(axis=1)
+        if dones is not None:
+            best_next = best_next * (1.0 - np.asarray(dones, dtype=np.float64))
+        td_target = rewards + self.gamma * best_next
+        td_error = td_target - q[indices, actions]
+        if not average:
+            np.add.at(q, (indices, actions), self.alpha * td_error)
+            return
+        flat = np.asarray(indices) * NUM_ACTIONS + actions
+        sums = np.bincount(flat, weights=td_error, minlength=q.size)
+        counts = np.bincount(flat, minlength=q.size)
+        seen = np.flatnonzero(counts)
+        q.reshape(-1)[seen] += self.alpha * sums[seen] / counts[seen]
+
     def decay_epsilon(self):
-        self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
\ No newline at end of file
+        self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
@@ -0,0 +1,132 @@
+import threading
+import time
+from pathlib import Path
+from .checkpoint import save_game_state, read_checkpoint, prune_histories
+
+AUTOSAVE_DIR = "save/autosave"
+
+
+def latest_autosave(directory=AUTOSAVE_DIR):
+    """Checkpoint automático mais recente em directory (maior episódio), ou None"""
+    paths = sorted(Path(directory).glob("autosave-*.ckpt"))
+    return paths[-1] if paths else None
+
+
+def _history_generation(path):
+    """Geração de histórico usada por um checkpoint existente (None se ilegível ou antigo)"""
+    try:
+        return read_checkpoint(path)[0].get('history_generation')
+    except (OSError, ValueError):
+        return None
+
+
+class AutoSaver:
+    """
+    Salvamento automático a cada N episódios e/ou T segundos. O treino só tira um
+    snapshot barato (cópia da Q-table); a escrita acontece numa thread em segundo plano.
+    Mantém os últimos `keep` checkpoints (autosave-<episódio>.ckpt), que compartilham
+    os arquivos de histórico só de acréscimo da mesma geração; os de gerações que
+    nenhum checkpoint mantido usa são apagados na rotação.
+    """
+
+    def __init__(self, snapshot_fn, every_episodes=None, every_seconds=None, keep=3,
+                 directory=AUTOSAVE_DIR, start_episode=0):
+        self.snapshot_fn = snapshot_fn
+        self.every_episodes = every_episodes
+        self.every_seconds = every_seconds
+        self.keep = keep
+        self.directory = Path(directory)
+        self.history_base = self.directory / "autosave"
+
+        self.saves = 0
+        self.skipped = 0  # Snapshots substituídos por um mais novo antes de serem gravados
+        self.last_latency = 0.0
+        self.total_latency = 0.0
+        self.snapshot_time = 0.0  # Tempo gasto na thread de treino (snapshot)
+        self._last_episode = start_episode  # Treino retomado: conta a partir do episódio carregado
+        self._last_time = time.monotonic()
+        self._history_saved = None
+        self._written = sorted(self.directory.glob("autosave-*.ckpt"))
+        self._generations = {path: _history_generation(path) for path in self._written}
+
+        # Um único snapshot pendente: se a escrita atrasar, o mais recente substitui o anterior
+        self._pending = None
+        self._condition = threading.Condition()
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def maybe_save(self, episode):
+        """Chamado a cada episódio; dispara um snapshot quando algum gatilho vence"""
+        now = time.monotonic()
+        due = (self.every_episodes and episode - self._last_episode >= self.every_episodes) or \
+              (self.every_seconds and now - self._last_time >= self.every_seconds)
+        if due:
+            self.request(episode)
+        return bool(due)
+
+    def request(self, episode):
+        start = time.perf_counter()
+        snapshot = self.snapshot_fn()
+        self.snapshot_time += time.perf_counter() - start
+        self._last_episode = episode
+        self._last_time = time.monotonic()
+        with self._condition:
+            if self._pending is not None:
+                self.skipped += 1
+            self._pending = (episode, snapshot)
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closing:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                episode, snapshot = self._pending
+                self._pending = None
+            try:
+                self._write(episode, snapshot)
+            except Exception as e:
+                print(f"Erro no salvamento automático: {e}")
+
+    def _write(self, episode, snapshot):
+        start = time.perf_counter()
+        path = self.directory / f"autosave-{episode:09d}.ckpt"
+        self._history_saved = save_game_state(path, snapshot, self._history_saved, self.history_base)
+
+        # Rotação: apaga os checkpoints mais antigos além de keep
+        if path not in self._written:
+            self._written.append(path)
+        self._generations[path] = self._history_saved[0]
+        while len(self._written) > self.keep:
+            old = self._written.pop(0)
+            self._generations.pop(old, None)
+            old.unlink(missing_ok=True)
+        prune_histories(self.history_base, set(self._generations.values()))
+
+        self.last_latency = time.perf_counter() - start
+        self.total_latency += self.last_latency
+        self.saves += 1
+        print(f"Salvamento automático: {path} ({self.last_latency * 1000:.1f} ms)")
+
+    def latest(self):
+        """Checkpoint automático mais recente (ou None)"""
+        return self._written[-1] if self._written else None
+
+    def stats(self):
+        return {
+            'saves': self.saves,
+            'skipped': self.skipped,
+            'last_latency': self.last_latency,
+            'mean_latency': self.total_latency / self.saves if self.saves else 0.0,
+            'snapshot_time': self.snapshot_time,
+        }
+
+    def close(self):
+        """Grava o snapshot pendente (se houver) e encerra a thread"""
+        with self._condition:
+            self._closing = True
+            self._condition.notify()
+        self._thread.join()
@@ -0,0 +1,304 @@
+import glob
+import json
+import os
+import pickle
+import struct
+from pathlib import Path
+import numpy as np
+
+# Formato binário versionado:
+#   magic (8 bytes) | versão (uint32) | tamanho do cabeçalho (uint32) | cabeçalho JSON
+#   | seções de arrays alinhadas em 64 bytes (offset/dtype/shape descritos no cabeçalho)
+MAGIC = b"IACKPT\x00\x01"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_PREFIX = struct.Struct("<8sII")
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def atomic_write(path, write):
+    """Escreve em um arquivo temporário e renomeia: o destino nunca fica pela metade"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, 'wb') as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _layout(meta, specs):
+    """Cabeçalho codificado, seções e tamanho total para specs {nome: (dtype, shape)}"""
+    sections = {}
+    header = {'meta': meta, 'sections': sections}
+
+    # O cabeçalho inclui os offsets, que dependem do tamanho do próprio cabeçalho
+    data_start = 0
+    while True:
+        offset = data_start
+        for name, (dtype, shape) in specs.items():
+            dtype = np.dtype(dtype)
+            sections[name] = {'offset': offset, 'dtype': dtype.str, 'shape': [int(n) for n in shape]}
+            offset = _align(offset + dtype.itemsize * int(np.prod(shape)))
+        encoded = json.dumps(header).encode('utf-8')
+        needed = _align(_PREFIX.size + len(encoded))
+        if needed <= data_start:
+            return encoded, sections, offset
+        data_start = needed
+
+
+def write_checkpoint(path, meta, arrays):
+    """Salva meta (dict JSON) e arrays NumPy em um único arquivo, de forma atômica"""
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    encoded, sections, _ = _layout(meta, {name: (array.dtype, array.shape) for name, array in arrays.items()})
+
+    def write(f):
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(encoded)))
+        f.write(encoded)
+        for name, array in arrays.items():
+            f.seek(sections[name]['offset'])
+            f.write(array.tobytes())
+
+    atomic_write(path, write)
+
+
+def allocate_checkpoint(path, meta, specs):
+    """
+    Cria o arquivo com o cabeçalho e as seções de specs ({nome: (dtype, shape)}) zeradas,
+    para serem preenchidas depois via np.memmap (inclusive por vários processos).
+    Retorna as seções ({nome: {'offset', 'dtype', 'shape'}}). Não é atômico: escreva
+    num caminho temporário e renomeie ao terminar.
+    """
+    encoded, sections, size = _layout(meta, specs)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(encoded)))
+        f.write(encoded)
+        f.truncate(size)  # Arquivo esparso: as páginas só ocupam disco quando escritas
+    return sections
+
+
+def read_checkpoint(path):
+    """
+    Lê o cabeçalho e mapeia as seções em memória (somente leitura, sem desserializar).
+    Retorna (meta, {nome: np.memmap}).
+    """
+    path = Path(path)
+    with open(path, 'rb') as f:
+        magic, version, header_len = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} não é um checkpoint válido")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Versão de checkpoint {version} não suportada (máx. {FORMAT_VERSION})")
+        header = json.loads(f.read(header_len).decode('utf-8'))
+
+    arrays = {}
+    for name, section in header['sections'].items():
+        shape = tuple(section['shape'])
+        if int(np.prod(shape)) == 0:
+            arrays[name] = np.empty(shape, dtype=section['dtype'])
+            continue
+        arrays[name] = np.memmap(path, dtype=section['dtype'], mode='r',
+                                 offset=section['offset'], shape=shape)
+    return header['meta'], arrays
+
+
+def pack_grid(grid):
+    return np.packbits(np.asarray(grid) == 1)
+
+
+def unpack_grid(packed, shape):
+    rows, cols = shape
+    return np.unpackbits(np.asarray(packed), count=rows * cols).reshape(rows, cols)
+
+
+class HistoryFile:
+    """
+    Histórico float64 só de acréscimo (arquivo bruto). O número de registros válidos
+    fica no checkpoint; registros além dele (ex.: queda no meio do save) são ignorados.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def sync(self, values, values_len, saved_count):
+        """
+        Grava values[:values_len] tendo saved_count registros já persistidos; retorna o
+        total realmente gravado (menor que values_len se values encolheu desde o snapshot)
+        """
+        if saved_count > values_len:
+            # Reescrever aqui apagaria registros que checkpoints antigos ainda usam:
+            # um histórico reiniciado deve ir para uma nova geração (ver save_game_state)
+            raise ValueError(f"Histórico {self.path} encolheu ({saved_count} -> {values_len} registros)")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'ab') as f:
+            f.truncate(saved_count * 8)
+            f.seek(saved_count * 8)
+            data = np.asarray(values[saved_count:values_len], dtype='<f8')
+            f.write(data.tobytes())
+        return saved_count + len(data)
+
+    def load(self, count):
+        if count == 0:
+            return np.empty(0)
+        available = self.path.stat().st_size // 8 if self.path.exists() else 0
+        if available < count:
+            raise ValueError(f"Histórico {self.path} tem {available} registros; o checkpoint espera {count}")
+        return np.memmap(self.path, dtype='<f8', mode='r', shape=(count,))
+
+
+def history_paths(path, generation=None):
+    """Arquivos de histórico de path; cada geração (RewardStats.generation) tem os seus"""
+    path = Path(path)
+    stem = path.with_suffix('')
+    name = stem.name + (f".{generation}" if generation else "")
+    return (HistoryFile(stem.with_name(name + ".rewards.f8")),
+            HistoryFile(stem.with_name(name + ".avg.f8")))
+
+
+def prune_histories(history_base, keep):
+    """
+    Apaga os históricos por geração de history_base que não estão em keep; os sem
+    geração (checkpoints antigos) também, se None não estiver em keep
+    """
+    stem = Path(history_base).with_suffix('')
+    prefix = glob.escape(stem.name)
+    for kind in ("rewards", "avg"):
+        for file in stem.parent.glob(f"{prefix}.*.{kind}.f8"):
+            if file.name[len(stem.name) + 1:-len(f".{kind}.f8")] not in keep:
+                file.unlink(missing_ok=True)
+    if None not in keep:
+        for file in history_paths(history_base):
+            file.path.unlink(missing_ok=True)
+
+
+def agent_meta(agent):
+    return {
+        'alpha': agent.alpha,
+        'gamma': agent.gamma,
+        'epsilon': agent.epsilon,
+        'epsilon_min': agent.epsilon_min,
+        'epsilon_decay': agent.epsilon_decay,
+    }
+
+
+def save_model_state(path, agent):
+    write_checkpoint(path, {'kind': 'model', 'agent': agent_meta(agent)}, {'q_table': agent.q_array()})
+
+
+def save_model_snapshot(path, snapshot):
+    """Checkpoint de modelo (como save_model_state) a partir de um game_snapshot"""
+    write_checkpoint(path, {'kind': 'model', 'agent': snapshot['meta']['agent']},
+                     {'q_table': snapshot['q_table']})
+
+
+def game_snapshot(state, agent, roadmap, rewards, avg_rewards, generation=None):
+    """
+    Cópia barata do estado para salvar (inclusive em outra thread): a Q-table é copiada
+    e dos históricos (listas só de acréscimo) guarda-se apenas a referência e o tamanho.
+    generation: identificador do histórico (RewardStats.generation).
+    """
+    meta = dict(state)
+    meta.update({
+        'kind': 'game',
+        'agent': agent_meta(agent),
+        'roadmap': {
+            'shape': list(roadmap.grid.shape),
+            'checkpoints': [[int(v) for v in cp] for cp in roadmap.checkpoints],
+            'current_checkpoint': int(roadmap.current_checkpoint),
+            'start_pos': [int(v) for v in roadmap.start_pos],
+        },
+    })
+    return {
+        'meta': meta,
+        'q_table': agent.q_array().copy(),
+        'grid': roadmap.grid,  # O grid não muda depois de gerado
+        'rewards': (rewards, len(rewards)),
+        'avg_rewards': (avg_rewards, len(avg_rewards)),
+        'generation': generation,
+    }
+
+
+def save_game_state(path, snapshot, saved=None, history_base=None):
+    """
+    Salva um game_snapshot: Q-table, grid em bits e metadados no checkpoint; históricos
+    acrescentados aos arquivos .f8 da geração do snapshot em history_base (padrão: o
+    próprio path). saved é o retorno do save anterior, (geração, registros gravados),
+    ou None. Uma geração nova começa arquivos novos: os da anterior nunca são
+    reescritos. Retorna (geração, recompensas gravadas, médias gravadas).
+    """
+    path = Path(path)
+    history_base = Path(history_base) if history_base is not None else path
+    generation = snapshot.get('generation')
+    if saved is None or saved[0] != generation:
+        saved = (generation, 0, 0)
+    rewards_file, avg_file = history_paths(history_base, generation)
+    saved = (generation, rewards_file.sync(*snapshot['rewards'], saved[1]),
+             avg_file.sync(*snapshot['avg_rewards'], saved[2]))
+    meta = dict(snapshot['meta'])
+    meta['history_base'] = history_base.name
+    meta['history_generation'] = generation
+    meta['history_length'] = list(saved[1:])
+    # O checkpoint é escrito por último: só ele "publica" os novos tamanhos de histórico
+    write_checkpoint(path, meta, {'q_table': snapshot['q_table'], 'grid': pack_grid(snapshot['grid'])})
+    return saved
+
+
+def load_game_state(path):
+    """Retorna (meta, q_table, grid, rewards, avg_rewards); arrays mapeados em memória"""
+    path = Path(path)
+    meta, arrays = read_checkpoint(path)
+    rewards_file, avg_file = history_paths(path.with_name(meta.get('history_base', path.name)),
+                                           meta.get('history_generation'))
+    rewards_len, avg_len = meta['history_length']
+    grid = unpack_grid(arrays['grid'], meta['roadmap']['shape'])
+    return meta, arrays['q_table'], grid, rewards_file.load(rewards_len), avg_file.load(avg_len)
+
+
+def migrate_legacy(save_dir="save"):
+    """Converte save/game_state.pkl e save/q_learning_model.pkl para o formato binário"""
+    from .agent import QLearningAgent
+    from .stats import new_generation
+
+    save_dir = Path(save_dir)
+    migrated = []
+
+    def legacy_agent(data):
+        agent = QLearningAgent(storage="dense")
+        agent.set_q_table(data['q_table'])
+        for key in ('alpha', 'gamma', 'epsilon', 'epsilon_min', 'epsilon_decay'):
+            if key in data:
+                setattr(agent, key, data[key])
+        return agent
+
+    model_pkl = save_dir / "q_learning_model.pkl"
+    if model_pkl.exists():
+        with open(model_pkl, 'rb') as f:
+            data = pickle.load(f)
+        save_model_state(save_dir / "q_learning_model.ckpt", legacy_agent(data))
+        migrated.append(model_pkl)
+
+    game_pkl = save_dir / "game_state.pkl"
+    if game_pkl.exists():
+        with open(game_pkl, 'rb') as f:
+            state = pickle.load(f)
+        save_game_state(save_dir / "game_state.ckpt", game_snapshot({
+            'episodes': state['episodes'],
+            'total_rewards': state['total_rewards'],
+            'agent_pos': [int(v) for v in state['agent_pos']],
+            'start_time': state['start_time'],
+        }, legacy_agent(state['agent']), state['roadmap'],
+            state.get('rewards_history', []), state.get('avg_rewards_history', []), new_generation()))
+        migrated.append(game_pkl)
+
+    return migrated
+
+
+if __name__ == "__main__":
+    for path in migrate_legacy():
+        print(f"Migrado: {path}")
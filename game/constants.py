@@ -2,6 +2,7 @@
 WIDTH, HEIGHT = 600, 600
 CELL_SIZE = 20
 ROWS, COLS = HEIGHT // CELL_SIZE, WIDTH // CELL_SIZE
+RENDER_FPS = 60  # Quadros por segundo da janela (independente da simulação)
 
 # Cores
 WHITE = (255, 255, 255)
@@ -18,4 +19,20 @@ ALPHA = 0.1  # Taxa de aprendizado
 GAMMA = 0.9  # Fator de desconto
 EPSILON_START = 1.0
 EPSILON_MIN = 0.01
-EPSILON_DECAY = 0.995
\ No newline at end of file
+EPSILON_DECAY = 0.995
+
+# Salvamento automático (em segundo plano)
+AUTOSAVE_EPISODES = 1000  # A cada N episódios
+AUTOSAVE_SECONDS = 300  # Ou a cada T segundos
+AUTOSAVE_KEEP = 3  # Checkpoints automáticos mantidos
+
+# Gravação de trajetórias (replay em game/replay_viewer.py)
+RECORD_EVERY = 100  # Grava um episódio a cada N
+TRAJECTORY_PATH = "save/trajectories.traj"
+
+# Conjunto de labirintos pré-gerados (game/maze_dataset.py)
+DATASET_PATH = "save/mazes.dataset"
+
+# Instrumentação e perfilamento (teclas I, P e M na janela)
+INSTRUMENTATION_LOG_EVERY = 100  # Linha de log por fase a cada N episódios
+PROFILE_EPISODES = 100  # Tamanho da janela de cProfile/tracemalloc
@@ -0,0 +1,100 @@
+from .roadmap import RoadMap
+from .agent import QLearningAgent
+from .constants import *
+
+# Ações: 0: cima, 1: direita, 2: baixo, 3: esquerda
+ACTION_DR = (-1, 0, 1, 0)
+ACTION_DC = (0, 1, 0, -1)
+MAX_EPISODE_STEPS = 1000  # Limite de passos por episódio
+
+
+class Environment:
+    """Simulação pura do labirinto (sem pygame/matplotlib)"""
+
+    def __init__(self, agent=None, maze_source=None, shaping=0.0, rows=ROWS, cols=COLS):
+        # maze_source: objeto com next_roadmap() (ex.: MazePool); sem ele gera na hora
+        self.maze_source = maze_source
+        self.rows, self.cols = rows, cols  # Tamanho dos labirintos gerados na hora
+        # shaping > 0: recompensa extra baseada em potencial, Φ = -shaping * distância restante,
+        # F = γΦ(s') - Φ(s) com Φ = 0 em transições terminais. A garantia de não alterar a
+        # política ótima vale para Φ função do estado do MDP; aqui Φ depende da posição
+        # absoluta e dos checkpoints restantes, não do (dx, dy) agregado que o agente
+        # aprende, então o shaping pode mudar a política aprendida: é uma heurística
+        # para acelerar a convergência, a validar com game.evaluation.
+        self.shaping = shaping
+        self.roadmap = self.next_roadmap()
+        self.agent_pos = self.roadmap.start_pos
+        self.agent = agent if agent is not None else QLearningAgent()
+        self.steps = 0
+        self.completed = False
+
+    def next_roadmap(self):
+        if self.maze_source is not None:
+            return self.maze_source.next_roadmap()
+        return RoadMap(rows=self.rows, cols=self.cols)
+
+    def reset(self, maze_index=None):
+        # maze_index: carrega esse labirinto da fonte (ex.: MazeDataset.roadmap) em vez do próximo
+        self.roadmap = self.next_roadmap() if maze_index is None else self.maze_source.roadmap(maze_index)
+        self.agent_pos = self.roadmap.start_pos
+        self.roadmap.current_checkpoint = 0
+        self.steps = 0
+        self.completed = False
+        return self.get_state()
+
+    def get_state(self):
+        # Verificação adicional de segurança
+        if len(self.roadmap.checkpoints) == 0:
+            return (0, 0)  # Estado padrão se não houver checkpoints
+
+        # Garante que current_checkpoint está dentro dos limites
+        self.roadmap.current_checkpoint = min(self.roadmap.current_checkpoint, len(self.roadmap.checkpoints)-1)
+        checkpoint_pos = self.roadmap.checkpoints[self.roadmap.current_checkpoint]
+        return self.agent.get_state_key(self.agent_pos, checkpoint_pos, self.roadmap)
+
+    def potential(self):
+        """Potencial do estado atual para o shaping (0 quando não há caminho)"""
+        remaining = self.roadmap.remaining_distance(self.agent_pos)
+        return -self.shaping * remaining if remaining > 0 else 0.0
+
+    def optimality_ratio(self):
+        """
+        Passos mínimos (campo de distância BFS) / passos dados no episódio, se completou
+        todos os checkpoints; 0 caso contrário.
+        """
+        if not self.completed or self.steps == 0:
+            return 0.0
+        return max(self.roadmap.optimal_steps(), 0) / self.steps
+
+    def move_agent(self, action):
+        if self.shaping:
+            potential = self.potential()
+        new_row = self.agent_pos[0] + ACTION_DR[action]
+        new_col = self.agent_pos[1] + ACTION_DC[action]
+
+        reward = 0
+        done = False
+
+        # Verificar se o movimento é válido
+        if not self.roadmap.is_road(new_row, new_col):
+            reward = -10  # Penalidade por sair da estrada
+            done = True
+        else:
+            self.agent_pos = (new_row, new_col)
+            self.steps += 1
+            reward = -0.1  # Pequena penalidade por passo para incentivar eficiência
+
+            # Verificar se alcançou o checkpoint (se houver checkpoints)
+            if len(self.roadmap.checkpoints) > 0 and self.agent_pos == self.roadmap.checkpoints[self.roadmap.current_checkpoint]:
+                reward = 10  # Grande recompensa por alcançar o checkpoint
+                self.roadmap.current_checkpoint += 1
+
+                if self.roadmap.current_checkpoint >= len(self.roadmap.checkpoints):
+                    reward = 20  # Recompensa máxima por completar todos os checkpoints
+                    done = True
+                    self.completed = True
+
+        if self.shaping:
+            reward += (0.0 if done else self.agent.gamma * self.potential()) - potential
+
+        return reward, done
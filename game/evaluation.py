@@ -0,0 +1,116 @@
+import time
+import numpy as np
+from .roadmap import RoadMap
+from .agent import QLearningAgent
+from .vector_env import VectorEnvironment
+from .checkpoint import read_checkpoint
+from .inference import FrozenPolicy
+from .constants import ROWS, COLS
+
+EVAL_SEED = 1_000_000  # Seeds dos labirintos de avaliação (o treino usa labirintos sem seed)
+
+
+def evaluate(agent, num_mazes=1000, seed=EVAL_SEED, batch_size=1024, dataset=None, rows=ROWS, cols=COLS):
+    """
+    Avalia a política gulosa com a Q-table congelada (sem aprendizado nem exploração)
+    em num_mazes labirintos fixos RoadMap(seed=seed + i, rows, cols), em lotes
+    vetorizados; com dataset (MazeDataset), usa os primeiros num_mazes labirintos dele
+    (no tamanho do conjunto, ignorando rows/cols).
+    Retorna taxa de sucesso, passos médios, taxa de batida na parede, fração de
+    checkpoints completados e otimalidade média dos episódios com sucesso.
+    """
+    if dataset is not None:
+        num_mazes = min(num_mazes, len(dataset))
+        rows, cols = dataset.rows, dataset.cols
+    policy = FrozenPolicy.from_agent(agent)  # Cópia: a avaliação não altera o agente
+    completed = wall_hits = timeouts = 0
+    total_steps = 0
+    total_reward = 0.0
+    checkpoint_fraction = 0.0
+    optimality = 0.0
+    start = time.perf_counter()
+
+    for first in range(0, num_mazes, batch_size):
+        indices = range(first, min(first + batch_size, num_mazes))
+        roadmaps = ([dataset.roadmap(i) for i in indices] if dataset is not None
+                    else [RoadMap(seed=seed + i, rows=rows, cols=cols) for i in indices])
+        env = VectorEnvironment(len(roadmaps), rows=rows, cols=cols)
+        for i, roadmap in enumerate(roadmaps):
+            env.load_roadmap(i, roadmap)
+        success = np.zeros(env.num_envs, dtype=bool)
+        wall = np.zeros(env.num_envs, dtype=bool)
+
+        while not env.done.all():
+            _, rewards, dones, _ = env.step(policy.act_states(env.get_states()), auto_reset=False)
+            success |= dones & (rewards == 20.0)
+            wall |= dones & (rewards == -10.0)
+
+        completed += int(success.sum())
+        wall_hits += int(wall.sum())
+        timeouts += int((~success & ~wall).sum())
+        total_steps += int(env.steps.sum())
+        total_reward += float(env.episode_rewards.sum())
+        reached = np.minimum(env.current_checkpoint, env.num_checkpoints)
+        checkpoint_fraction += float((reached / np.maximum(env.num_checkpoints, 1)).sum())
+        for i in np.flatnonzero(success):
+            optimality += max(roadmaps[i].optimal_steps(), 0) / max(int(env.steps[i]), 1)
+
+    elapsed = time.perf_counter() - start
+    return {
+        'episodes': num_mazes,
+        'success_rate': completed / num_mazes,
+        'wall_hit_rate': wall_hits / num_mazes,
+        'timeout_rate': timeouts / num_mazes,
+        'checkpoint_completion': checkpoint_fraction / num_mazes,
+        'mean_steps': total_steps / num_mazes,
+        'mean_reward': total_reward / num_mazes,
+        'optimality': optimality / completed if completed else 0.0,
+        'elapsed': elapsed,
+        'episodes_per_sec': num_mazes / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def format_report(report):
+    return (f"Sucesso: {report['success_rate'] * 100:.1f}%, Parede: {report['wall_hit_rate'] * 100:.1f}%, "
+            f"Limite de passos: {report['timeout_rate'] * 100:.1f}%, "
+            f"Checkpoints: {report['checkpoint_completion'] * 100:.1f}%, "
+            f"Passos médios: {report['mean_steps']:.1f}, Otimalidade: {report['optimality']:.2f} "
+            f"({report['episodes']} labirintos em {report['elapsed']:.2f}s)")
+
+
+def main():
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Avaliação gulosa do modelo em labirintos fixos")
+    parser.add_argument("--model", default="save/q_learning_model.ckpt", help="Checkpoint do modelo")
+    parser.add_argument("--mazes", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=EVAL_SEED)
+    parser.add_argument("--batch-size", type=int, default=1024)
+    parser.add_argument("--rows", type=int, default=ROWS, help="Linhas dos labirintos")
+    parser.add_argument("--cols", type=int, default=COLS, help="Colunas dos labirintos")
+    parser.add_argument("--dataset", default=None,
+                        help="Conjunto de labirintos (game.maze_dataset) em vez das seeds")
+    parser.add_argument("--split", default="test", help="Partição do conjunto usada na avaliação")
+    parser.add_argument("--min-success", type=float, default=None,
+                        help="Taxa de sucesso mínima; abaixo dela o código de saída é 1")
+    args = parser.parse_args()
+
+    meta, arrays = read_checkpoint(args.model)
+    agent = QLearningAgent(storage="dense")
+    agent.apply_checkpoint(meta['agent'], arrays['q_table'])
+
+    dataset = None
+    if args.dataset:
+        from .maze_dataset import MazeDataset
+        dataset = MazeDataset(args.dataset, split=args.split)
+    report = evaluate(agent, args.mazes, args.seed, args.batch_size, dataset=dataset,
+                      rows=args.rows, cols=args.cols)
+    print(format_report(report))
+    if args.min_success is not None and report['success_rate'] < args.min_success:
+        print(f"Reprovado: sucesso abaixo de {args.min_success * 100:.1f}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
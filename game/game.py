@@ -1,234 +1,401 @@
-import pygame
 import time
-from .roadmap import RoadMap
+from .roadmap import RoadMap, MazeSpec
 from .agent import QLearningAgent
+from .environment import Environment, MAX_EPISODE_STEPS
 from .constants import *
-import os
-import pickle
 from pathlib import Path
+from .checkpoint import (game_snapshot, save_game_state, load_game_state, migrate_legacy, prune_histories,
+                         save_model_snapshot)
 from .metrics_window import MetricsWindow
+from .autosave import AutoSaver
+from .instrumentation import PhaseStats, ProfileWindow, NULL_TIMER
+from .stats import RewardStats
+from .trajectory import TrajectoryRecorder
 
-class Game:
-    def __init__(self):
-        pygame.init()
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption("IA Treinando para Navegar em Estradas")
-        
-        self.roadmap = RoadMap()
-        self.agent_pos = self.roadmap.start_pos
-        self.agent = QLearningAgent()
+class Game(Environment):
+    def __init__(self, maze_source=None, metrics=True, rows=ROWS, cols=COLS):
+        # pygame, janela, fontes e o processo de métricas só são criados quando usados
+        # (primeiro quadro / primeiro episódio): carregar um modelo e treinar não paga por eles
+        super().__init__(maze_source=maze_source, rows=rows, cols=cols)
+        self.screen = None
+        self.font = None
+        self.update_view()
         self.episodes = 0
-        self.steps = 0
         self.total_rewards = 0
+        self.optimality_total = 0.0  # Soma das razões de otimalidade desde o último log
         self.running = True
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont(None, 36)
         self.start_time = time.time()
-        self.rewards_history = []
-        self.avg_rewards_history = []
-        self.metrics_window = MetricsWindow() 
-
-    def save_game(self, filename="game_state.pkl"):
-        """Salva o estado completo do jogo"""
-        save_dir = Path("save")
-        save_dir.mkdir(exist_ok=True)
-        
-        state = {
+        # Recompensas por episódio: janela móvel, EWMA, quantis e históricos em disco (memória constante)
+        self.reward_stats = RewardStats()
+        self._history_saved = None  # (geração, registros) do histórico já gravados em disco
+        self.autosaver = None
+        self.recorder = None  # TrajectoryRecorder quando ativado (ver enable_recording)
+        self.instrumentation = None  # PhaseStats quando ativada (ver enable_instrumentation)
+        self.profile_window = None
+        self.metrics = metrics
+        self.metrics_window = None
+        # Renderização desacoplada da simulação (quadros a RENDER_FPS)
+        self.frame_interval = 1.0 / RENDER_FPS
+        self._next_frame = 0.0
+        self.key_events = []
+        # Estado da renderização incremental (dirty rects)
+        self._drawn_roadmap = None
+        self._dirty_rects = []
+        self._hud_surfaces = {}
+        # Mapas maiores que a janela: câmera (top, left em células) e fundo da área visível
+        self._camera = (0, 0)
+        self._background = None
+        self._view_surface = None
+
+    def update_view(self):
+        """Área visível do tamanho do mapa, limitada a WIDTH x HEIGHT (mapas maiores usam câmera)"""
+        self.view_rows = min(self.rows, HEIGHT // CELL_SIZE)
+        self.view_cols = min(self.cols, WIDTH // CELL_SIZE)
+        self._view_surface = None
+        self._drawn_roadmap = None
+
+    def open_display(self):
+        """Abre (ou redimensiona) a janela do pygame"""
+        import pygame
+        pygame.init()
+        self.screen = pygame.display.set_mode((self.view_cols * CELL_SIZE, self.view_rows * CELL_SIZE))
+        pygame.display.set_caption("IA Treinando para Navegar em Estradas")
+        self.font = pygame.font.SysFont(None, 36)
+        self._drawn_roadmap = None
+        return self.screen
+
+    def save_game(self, filename="game_state.ckpt", model_filename="q_learning_model.ckpt"):
+        """
+        Salva o estado completo do jogo (checkpoint binário + históricos incrementais) e,
+        do mesmo snapshot, o modelo em save/model_filename, lido por padrão por
+        game.evaluation, FrozenPolicy.load e o treino headless (None: não salva o modelo).
+        """
+        filepath = Path("save") / filename
+        snapshot = self.snapshot()
+        self._history_saved = save_game_state(filepath, snapshot, self._history_saved)
+        prune_histories(filepath, {self._history_saved[0]})  # Só este checkpoint usa estes históricos
+        if model_filename is not None:
+            save_model_snapshot(Path("save") / model_filename, snapshot)
+        print(f"Jogo salvo em {filepath}")
+
+    def enable_autosave(self, every_episodes=AUTOSAVE_EPISODES, every_seconds=AUTOSAVE_SECONDS,
+                        keep=AUTOSAVE_KEEP):
+        """Salvamento automático em segundo plano (ver AutoSaver)"""
+        self.autosaver = AutoSaver(self.snapshot, every_episodes, every_seconds, keep)
+        return self.autosaver
+
+    def enable_recording(self, path=TRAJECTORY_PATH, every=RECORD_EVERY):
+        """Grava um episódio a cada `every` para ver depois (python -m game.replay_viewer)"""
+        if self.recorder is not None:
+            self.recorder.close()
+        self.recorder = TrajectoryRecorder(path, every)
+        return self.recorder
+
+    def enable_instrumentation(self, log_every=INSTRUMENTATION_LOG_EVERY):
+        """Ativa os cronômetros por fase de run_episode (ver PhaseStats)"""
+        self.instrumentation = PhaseStats(log_every)
+        return self.instrumentation
+
+    def disable_instrumentation(self):
+        stats, self.instrumentation = self.instrumentation, None
+        return stats
+
+    def profile_episodes(self, episodes=PROFILE_EPISODES, kind="cprofile", path=None):
+        """Perfila os próximos N episódios com cProfile ou tracemalloc (ver ProfileWindow)"""
+        if self.profile_window is not None:
+            self.profile_window.stop()
+        self.profile_window = ProfileWindow(episodes, kind, path).start()
+        return self.profile_window
+
+    def snapshot(self):
+        """Cópia barata do estado atual para salvar (ver AutoSaver)"""
+        return game_snapshot({
             'episodes': self.episodes,
             'total_rewards': self.total_rewards,
-            'agent': {
-                'q_table': dict(self.agent.q_table),
-                'alpha': self.agent.alpha,
-                'gamma': self.agent.gamma,
-                'epsilon': self.agent.epsilon,
-                'epsilon_min': self.agent.epsilon_min,
-                'epsilon_decay': self.agent.epsilon_decay
-            },
-            'roadmap': self.roadmap,
-            'agent_pos': self.agent_pos,
+            'agent_pos': [int(v) for v in self.agent_pos],
             'start_time': self.start_time,
-            'rewards_history': self.rewards_history,
-            'avg_rewards_history': self.avg_rewards_history
-        }
-        
-        filepath = save_dir / filename
-        with open(filepath, 'wb') as f:
-            pickle.dump(state, f)
-        print(f"Jogo salvo em {filepath}")
+        }, self.agent, self.roadmap, self.reward_stats.rewards, self.reward_stats.averages,
+            self.reward_stats.generation)
+
+    def resume(self, filename="game_state.ckpt"):
+        """
+        Carrega o estado mais recente: save/filename ou o último salvamento automático,
+        se for mais novo (ex.: o processo caiu antes do save final).
+        """
+        from .autosave import latest_autosave
+        filepath = Path("save") / filename
+        autosave = latest_autosave()
+        if autosave is not None and (not filepath.exists() or autosave.stat().st_mtime > filepath.stat().st_mtime):
+            try:
+                return self.load_game(autosave.relative_to("save"))
+            except Exception as e:
+                print(f"Erro ao carregar {autosave}: {e}; tentando {filepath}")
+        return self.load_game(filename)
 
-    def load_game(self, filename="game_state.pkl"):
-        """Carrega o estado completo do jogo"""
+    def load_game(self, filename="game_state.ckpt"):
+        """Carrega o estado completo do jogo (migra o .pkl antigo se necessário)"""
         filepath = Path("save") / filename
+        if not filepath.exists() and filepath.with_suffix(".pkl").exists():
+            migrate_legacy(filepath.parent)
         if filepath.exists():
-            with open(filepath, 'rb') as f:
-                state = pickle.load(f)
-                
-                self.episodes = state['episodes']
-                self.total_rewards = state['total_rewards']
-                
-                # Recria o agente
-                self.agent = QLearningAgent()
-                def default_q_values():
-                    return np.zeros(4)
-                self.agent.q_table = defaultdict(default_q_values, state['agent']['q_table'])
-                self.agent.alpha = state['agent'].get('alpha', ALPHA)
-                self.agent.gamma = state['agent'].get('gamma', GAMMA)
-                self.agent.epsilon = state['agent'].get('epsilon', EPSILON_START)
-                self.agent.epsilon_min = state['agent'].get('epsilon_min', EPSILON_MIN)
-                self.agent.epsilon_decay = state['agent'].get('epsilon_decay', EPSILON_DECAY)
-                
-                self.roadmap = state['roadmap']
-                self.agent_pos = state['agent_pos']
-                self.start_time = state['start_time']
-                self.rewards_history = state.get('rewards_history', [])
-                self.avg_rewards_history = state.get('avg_rewards_history', [])
-                
-                # Reinicializa componentes do pygame
-                self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-                self.clock = pygame.time.Clock()
-                self.font = pygame.font.SysFont(None, 36)
-                self.running = True
+            meta, q_values, grid, rewards, avg_rewards = load_game_state(filepath)
+            
+            self.episodes = meta['episodes']
+            self.total_rewards = meta['total_rewards']
+            
+            # Recria o agente
+            self.agent = QLearningAgent(self.agent.storage)
+            self.agent.apply_checkpoint(meta['agent'], q_values)
+            
+            roadmap_meta = meta['roadmap']
+            self.roadmap = RoadMap.from_spec(MazeSpec(grid, roadmap_meta['checkpoints'], roadmap_meta['start_pos']))
+            self.roadmap.current_checkpoint = roadmap_meta['current_checkpoint']
+            self.agent_pos = tuple(meta['agent_pos'])
+            self.rows, self.cols = self.roadmap.rows, self.roadmap.cols
+            self.start_time = meta['start_time']
+            # O histórico carregado é uma nova geração: o próximo save o grava em arquivos novos
+            self.reward_stats.load(rewards, avg_rewards)
+            self._history_saved = None
+            
+            # Reinicializa a janela (se já aberta) para o tamanho do mapa carregado
+            self.update_view()
+            if self.screen is not None:
+                self.open_display()
+            self.running = True
                 
             print(f"Jogo carregado de {filepath}")
             return True
         print(f"Arquivo {filepath} não encontrado")
         return False
     
-    def reset(self):
-        self.roadmap = RoadMap()
-        self.agent_pos = self.roadmap.start_pos
-        self.roadmap.current_checkpoint = 0
-        self.steps = 0
-        return self.get_state()
-    
-    def get_state(self):
-        # Verificação adicional de segurança
-        if len(self.roadmap.checkpoints) == 0:
-            return (0, 0)  # Estado padrão se não houver checkpoints
-        
-        # Garante que current_checkpoint está dentro dos limites
-        self.roadmap.current_checkpoint = min(self.roadmap.current_checkpoint, len(self.roadmap.checkpoints)-1)
-        checkpoint_pos = self.roadmap.checkpoints[self.roadmap.current_checkpoint]
-        return self.agent.get_state_key(self.agent_pos, checkpoint_pos, self.roadmap)
-    
-    def move_agent(self, action):
-        # 0: cima, 1: direita, 2: baixo, 3: esquerda
-        dr = [-1, 0, 1, 0]
-        dc = [0, 1, 0, -1]
-        
-        new_row = self.agent_pos[0] + dr[action]
-        new_col = self.agent_pos[1] + dc[action]
-        
-        reward = 0
-        done = False
-        
-        # Verificar se o movimento é válido
-        if not self.roadmap.is_road(new_row, new_col):
-            reward = -10  # Penalidade por sair da estrada
-            done = True
-        else:
-            self.agent_pos = (new_row, new_col)
-            self.steps += 1
-            reward = -0.1  # Pequena penalidade por passo para incentivar eficiência
-            
-            # Verificar se alcançou o checkpoint (se houver checkpoints)
-            if len(self.roadmap.checkpoints) > 0 and self.agent_pos == self.roadmap.checkpoints[self.roadmap.current_checkpoint]:
-                reward = 10  # Grande recompensa por alcançar o checkpoint
-                self.roadmap.current_checkpoint += 1
-                
-                if self.roadmap.current_checkpoint >= len(self.roadmap.checkpoints):
-                    reward = 20  # Recompensa máxima por completar todos os checkpoints
-                    done = True
-        
-        return reward, done
-    
     def run_episode(self, render=False):
+        # Cronômetros por fase só com a instrumentação ativa; senão laps vazios (NULL_TIMER)
+        timer = self.instrumentation if self.instrumentation is not None else NULL_TIMER
+        timer.mark()
         state = self.reset()
+        timer.lap("reset")
         total_reward = 0
         done = False
+        actions = self._recorded_actions()
         
-        while not done and self.steps < 1000: # Limitar a 1000 passos por episódio
+        while not done and self.steps < MAX_EPISODE_STEPS:
             
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.close()  # Fecha o jogo corretamente
-                    return total_reward  # Retorna early se o jogo foi fechado
             action = self.agent.choose_action(state)
+            timer.lap("choose_action")
             reward, done = self.move_agent(action)
             next_state = self.get_state()
+            timer.lap("move")
             
             self.agent.learn(state, action, reward, next_state)
+            timer.lap("learn")
+            if actions is not None:
+                actions.append(action)
             state = next_state
             total_reward += reward
             
-            if render:
-                self.render()
-                self.clock.tick(120)
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    return total_reward
+            # Renderiza o estado mais recente só quando o orçamento de quadros permite
+            if render and not self.render_frame(timer):
+                return total_reward  # Janela fechada
         
-        self.agent.decay_epsilon()
-        self.episodes += 1
-        self.total_rewards += total_reward
-        self.rewards_history.append(total_reward)
+        timer.episode_done(self.steps)
+        avg = self._end_episode(total_reward)
+        timer.mark()
+        if actions is not None:
+            self.recorder.record(self.episodes, self.roadmap, actions, total_reward)
+            timer.lap("record")
         
-        # Calcular média móvel das recompensas
-        if len(self.rewards_history) >= 100:
-            avg = sum(self.rewards_history[-100:]) / 100
-        else:
-            avg = sum(self.rewards_history) / len(self.rewards_history) if self.rewards_history else 0
-        self.avg_rewards_history.append(avg)
+        if self.metrics:
+            self.update_metrics(total_reward, avg)
+            timer.lap("metrics")
         
-        try:
-            self.metrics_window.update(self.episodes, total_reward, avg, self.agent.epsilon)
-        except:
-            pass
+        if self.autosaver is not None:
+            self.autosaver.maybe_save(self.episodes)
+            timer.lap("autosave")
         
+        if self.profile_window is not None and self.profile_window.episode_done():
+            self.profile_window = None
+        
+        timer.maybe_log(self.episodes)
         return total_reward
     
+    def _recorded_actions(self):
+        """Lista para as ações do episódio que começa, se ele será gravado (senão None)"""
+        if self.recorder is not None and self.recorder.wants(self.episodes + 1):
+            return []
+        return None
+
+    def _end_episode(self, total_reward):
+        """Contabiliza o fim do episódio; retorna a média móvel das recompensas"""
+        self.agent.decay_epsilon()
+        self.episodes += 1
+        self.total_rewards += total_reward
+        self.optimality_total += self.optimality_ratio()
+        # Média móvel das recompensas (100 episódios) em O(1)
+        return self.reward_stats.add(total_reward)
+    
+    def update_metrics(self, total_reward, avg):
+        """Envia o episódio ao gráfico; o processo de métricas nasce no primeiro envio"""
+        if self.metrics_window is None:
+            self.metrics_window = MetricsWindow()
+        self.metrics_window.update(self.episodes, total_reward, avg, self.agent.epsilon)
+
+    def pump_events(self):
+        """Processa eventos da janela; teclas ficam em key_events para o loop principal"""
+        if self.screen is None:
+            return self.running  # Janela ainda não aberta: não há eventos
+        import pygame
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.running = False
+            elif event.type == pygame.KEYDOWN:
+                self.key_events.append(event.key)
+        return self.running
+
+    def render_frame(self, timer=NULL_TIMER):
+        """
+        Desenha um quadro se já passou o intervalo de RENDER_FPS desde o último.
+        A simulação segue em velocidade máxima; quadros excedentes são descartados.
+        Retorna False se a janela foi fechada.
+        """
+        now = time.perf_counter()
+        if now < self._next_frame:
+            return self.running
+        self._next_frame = now + self.frame_interval
+        running = self.pump_events()
+        timer.lap("events")
+        if running:
+            self.render()
+            timer.lap("render")
+        return self.running
+
+    def update_camera(self):
+        """
+        Câmera (top, left) em células: segue o agente com zona morta, movendo-se só
+        quando ele se aproxima da borda da tela; (0, 0) se o mapa cabe na janela.
+        """
+        roadmap = self.roadmap
+        if roadmap.fits(self.view_rows, self.view_cols):
+            return (0, 0)
+        top, left = self._camera
+        row, col = self.agent_pos
+        margin_rows, margin_cols = self.view_rows // 4, self.view_cols // 4
+        if not top + margin_rows <= row < top + self.view_rows - margin_rows:
+            top = row - self.view_rows // 2
+        if not left + margin_cols <= col < left + self.view_cols - margin_cols:
+            left = col - self.view_cols // 2
+        top = min(max(top, 0), roadmap.rows - self.view_rows)
+        left = min(max(left, 0), roadmap.cols - self.view_cols)
+        return (top, left)
+
     def render(self):
-        self.screen.fill(BLACK)
-        self.roadmap.draw(self.screen)
+        import pygame
+        if self.screen is None:
+            self.open_display()
+        top, left = camera = self.update_camera()
+        full_redraw = self._drawn_roadmap is not self.roadmap or camera != self._camera
+        if full_redraw:
+            if self.roadmap.fits(self.view_rows, self.view_cols):
+                # Labirinto novo: fundo estático inteiro uma única vez
+                background = self.roadmap.get_background()
+            else:
+                # Mapa grande: só a área visível, montada a partir dos blocos em cache
+                if self._view_surface is None:
+                    self._view_surface = pygame.Surface(self.screen.get_size())
+                background = self._view_surface
+                background.fill(BLACK)
+                self.roadmap.draw_view(background, top, left, self.view_rows, self.view_cols)
+            self.screen.blit(background, (0, 0))
+            self._background = background
+            self._drawn_roadmap = self.roadmap
+            self._camera = camera
+        else:
+            # Restaura o fundo só onde algo foi desenhado no quadro anterior
+            for rect in self._dirty_rects:
+                self.screen.blit(self._background, rect, rect)
+
+        dirty = self.roadmap.draw_checkpoints(self.screen, top, left)
         
         # Desenhar agente
-        pygame.draw.rect(self.screen, RED, (self.agent_pos[1] * CELL_SIZE, self.agent_pos[0] * CELL_SIZE, CELL_SIZE, CELL_SIZE))
+        agent_rect = ((self.agent_pos[1] - left) * CELL_SIZE, (self.agent_pos[0] - top) * CELL_SIZE,
+                      CELL_SIZE, CELL_SIZE)
+        pygame.draw.rect(self.screen, RED, agent_rect)
+        dirty.append(agent_rect)
         
         # Mostrar informações
-        info_text = [
+        hud_cache = {}
+        for i, text in enumerate(self.hud_lines()):
+            rendered_text = self._hud_surfaces.get(text)
+            if rendered_text is None:
+                rendered_text = self.font.render(text, True, WHITE)
+            hud_cache[text] = rendered_text
+            dirty.append(self.screen.blit(rendered_text, (10, 10 + i * 30)))
+        self._hud_surfaces = hud_cache
+        
+        if not self.roadmap.fits(self.view_rows, self.view_cols):
+            dirty.append(self.draw_minimap(top, left))
+        
+        if full_redraw:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self._dirty_rects + dirty)
+        self._dirty_rects = dirty
+
+    def hud_lines(self):
+        return [
             f"Episódio: {self.episodes}",
             f"Epsilon: {self.agent.epsilon:.2f}",
             f"Tempo: {int(time.time() - self.start_time)}s"
         ]
-        
-        for i, text in enumerate(info_text):
-            rendered_text = self.font.render(text, True, WHITE)
-            self.screen.blit(rendered_text, (10, 10 + i * 30))
-        
-        
-        pygame.display.flip()
+
+    def draw_minimap(self, top, left):
+        """Minimapa em cache no canto superior direito, com a área visível e o agente"""
+        import pygame
+        minimap, scale = self.roadmap.get_minimap()
+        x = self.screen.get_width() - minimap.get_width() - 10
+        y = 10
+        rect = self.screen.blit(minimap, (x, y))
+        pygame.draw.rect(self.screen, YELLOW,
+                         (x + left // scale, y + top // scale,
+                          max(self.view_cols // scale, 2), max(self.view_rows // scale, 2)), 1)
+        for i, (row, col) in enumerate(self.roadmap.checkpoints):
+            if i == self.roadmap.current_checkpoint:
+                pygame.draw.circle(self.screen, GREEN, (x + col // scale, y + row // scale), 2)
+        pygame.draw.circle(self.screen, RED, (x + self.agent_pos[1] // scale, y + self.agent_pos[0] // scale), 2)
+        pygame.draw.rect(self.screen, WHITE, rect.inflate(2, 2), 1)
+        return rect.inflate(6, 6)
+
     def close(self):
+        if self.autosaver is not None:
+            self.autosaver.close()
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
         try:
             self.metrics_window.close()
         except:
             pass
-        pygame.quit()
+        if self.screen is not None:
+            import pygame
+            pygame.quit()
+            self.screen = None
 
-    def train(self, episodes=1000):
+    def train(self, episodes=1000, render=True):
         # Limpar histórico ao iniciar novo treinamento
-        self.rewards_history = []
-        self.avg_rewards_history = []
+        self.reward_stats.reset()
         
+        # Todos os episódios rodam em velocidade máxima; a janela mostra o estado
+        # mais recente a RENDER_FPS (antes: um episódio extra renderizado a cada 10)
         for _ in range(episodes):
-            self.run_episode(render=False)
+            self.run_episode(render=render)
+            if not self.running:
+                break
             
             if self.episodes % 10 == 0:
-                avg_reward = self.total_rewards / 100
-                print(f"Episódio: {self.episodes}, Recompensa Média: {avg_reward:.1f}, Epsilon: {self.agent.epsilon:.2f}")
+                print(f"Episódio: {self.episodes}, {self.reward_stats.format()}, Epsilon: {self.agent.epsilon:.2f}, "
+                      f"Otimalidade: {self.optimality_total / 10:.2f}")
                 self.total_rewards = 0
-                
-                # Renderizar um episódio para visualização
-                self.run_episode(render=True)
+                self.optimality_total = 0.0
         
-        self.run_episode(render=True)
-        print("Treinamento concluído!")
\ No newline at end of file
+        print("Treinamento concluído!")
+        if self.instrumentation is not None:
+            print(f"Instrumentação: {self.instrumentation.format()}")
\ No newline at end of file
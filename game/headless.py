@@ -0,0 +1,243 @@
+import time
+from .agent import QLearningAgent, state_to_index
+from .environment import Environment, MAX_EPISODE_STEPS
+from .checkpoint import game_snapshot, load_game_state
+from .constants import ROWS, COLS, TRAJECTORY_PATH
+from .replay import ReplayBuffer, DynaModel, transitions_to_arrays
+from .kernel import UniformBlocks, run_episode_fused
+from .stats import RewardStats
+
+
+class HeadlessTrainer:
+    """Treinamento sem janela: roda episódios o mais rápido possível"""
+
+    def __init__(self, env=None, agent=None, replay=None, dyna=None, fused=False, seed=None, recorder=None):
+        if env is None:
+            env = Environment(agent if agent is not None else QLearningAgent(storage="dense"))
+        self.env = env
+        self.agent = self.env.agent
+        # Aprendizado extra por passo real: ReplayBuffer e/ou DynaModel (ver game/replay.py)
+        if (replay is not None or dyna is not None) and not self.agent.dense:
+            raise ValueError("Replay/Dyna requerem o agente com storage='dense'")
+        self.replay = replay
+        self.dyna = dyna
+        # fused=True: episódio inteiro em run_episode_fused, com a exploração sorteada em
+        # blocos de um Generator com seed (mesmo resultado que run_episode_reference)
+        if fused and (not self.agent.dense or self.env.shaping):
+            raise ValueError("O episódio fundido requer o agente denso e não suporta shaping")
+        self.uniforms = UniformBlocks(seed) if fused else None
+        self.episodes = 0
+        self.total_steps = 0
+        self.total_rewards = 0
+        self.optimality_total = 0.0  # Soma das razões de otimalidade desde o último log
+        self.reward_stats = RewardStats()
+        self.start_time = time.time()
+        self.autosaver = None
+        self.recorder = recorder  # TrajectoryRecorder: grava episódios escolhidos para o replay
+
+    def snapshot(self):
+        """Cópia barata do estado atual para salvar (ver AutoSaver)"""
+        return game_snapshot({
+            'episodes': self.episodes,
+            'total_rewards': self.total_rewards,
+            'agent_pos': [int(v) for v in self.env.agent_pos],
+            'start_time': self.start_time,
+        }, self.agent, self.env.roadmap, self.reward_stats.rewards, self.reward_stats.averages,
+            self.reward_stats.generation)
+
+    def resume(self, path):
+        """Retoma de um checkpoint de jogo (ex.: o último autosave): Q-table, contadores e históricos"""
+        meta, q_values, _, rewards, avg_rewards = load_game_state(path)
+        self.agent.apply_checkpoint(meta['agent'], q_values)
+        self.episodes = meta['episodes']
+        self.total_rewards = meta['total_rewards']
+        self.start_time = meta['start_time']
+        self.reward_stats.load(rewards, avg_rewards)
+        print(f"Treino retomado de {path} (episódio {self.episodes})")
+
+    def run_episode(self):
+        env = self.env
+        agent = self.agent
+        offline = self.replay is not None or self.dyna is not None
+        record = self.recorder is not None and self.recorder.wants(self.episodes + 1)
+        transitions = ([], [], [], [], []) if offline or record else None
+        if self.uniforms is not None:
+            total_reward = run_episode_fused(env, agent, self.uniforms, transitions)
+        else:
+            total_reward = self._run_steps(transitions)
+
+        if offline and transitions[1]:
+            self.learn_offline(transitions)
+
+        agent.decay_epsilon()
+        self.episodes += 1
+        self.total_steps += env.steps
+        self.total_rewards += total_reward
+        self.optimality_total += env.optimality_ratio()
+        self.reward_stats.add(total_reward)
+        if record:
+            self.recorder.record(self.episodes, env.roadmap, transitions[1], total_reward)
+
+        if self.autosaver is not None:
+            self.autosaver.maybe_save(self.episodes)
+
+        return total_reward
+
+    def _run_steps(self, transitions):
+        """Laço de passos original (random do Python); retorna a recompensa total"""
+        env = self.env
+        agent = self.agent
+        state = env.reset()
+        total_reward = 0
+        done = False
+        record = transitions is not None
+
+        while not done and env.steps < MAX_EPISODE_STEPS:
+            action = agent.choose_action(state)
+            reward, done = env.move_agent(action)
+            next_state = env.get_state()
+
+            agent.learn(state, action, reward, next_state)
+            if record:
+                transitions[0].append(state_to_index(state))
+                transitions[1].append(action)
+                transitions[2].append(reward)
+                transitions[3].append(state_to_index(next_state))
+                transitions[4].append(done)
+            state = next_state
+            total_reward += reward
+
+        return total_reward
+
+    def learn_offline(self, transitions):
+        """Replay e planejamento Dyna do episódio, em lotes vetorizados (uma vez por episódio)"""
+        steps = len(transitions[1])
+        if self.replay is not None:
+            self.replay.add_batch(*transitions_to_arrays(*transitions))
+            self.replay.replay(self.agent, steps)
+        if self.dyna is not None:
+            self.dyna.observe_batch(*transitions)
+            self.dyna.plan(self.agent, steps)
+
+    def train(self, episodes=1000, log_every=100):
+        start = time.perf_counter()
+        start_steps = self.total_steps
+
+        for _ in range(episodes):
+            self.run_episode()
+
+            if log_every and self.episodes % log_every == 0:
+                elapsed = time.perf_counter() - start
+                steps_per_sec = (self.total_steps - start_steps) / elapsed if elapsed > 0 else 0
+                print(f"Episódio: {self.episodes}, {self.reward_stats.format()}, "
+                      f"Epsilon: {self.agent.epsilon:.2f}, Otimalidade: {self.optimality_total / log_every:.2f}, "
+                      f"Passos/s: {steps_per_sec:.0f}")
+                self.optimality_total = 0.0
+
+        elapsed = time.perf_counter() - start
+        print(f"Treinamento headless concluído: {episodes} episódios em {elapsed:.1f}s")
+        return elapsed
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Treinamento headless (sem janela)")
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--log-every", type=int, default=100)
+    parser.add_argument("--no-load", action="store_true", help="Não carrega o modelo salvo")
+    parser.add_argument("--prefetch", type=int, default=0,
+                        help="Profundidade da fila de labirintos pré-gerados (0 desativa)")
+    parser.add_argument("--prefetch-workers", type=int, default=1)
+    parser.add_argument("--autosave-episodes", type=int, default=None)
+    parser.add_argument("--autosave-seconds", type=float, default=None)
+    parser.add_argument("--autosave-keep", type=int, default=3)
+    parser.add_argument("--resume", action="store_true",
+                        help="Retoma do salvamento automático mais recente (save/autosave), ex.: após uma queda")
+    parser.add_argument("--shaping", type=float, default=0.0,
+                        help="Escala do shaping por potencial (distância BFS restante; ex.: 0.02; 0 desativa)")
+    parser.add_argument("--replay-ratio", type=float, default=0,
+                        help="Transições do replay buffer reaproveitadas por passo real (0 desativa)")
+    parser.add_argument("--replay-capacity", type=int, default=50000)
+    parser.add_argument("--dyna-steps", type=float, default=0,
+                        help="Passos de planejamento Dyna-Q por passo real (0 desativa)")
+    parser.add_argument("--rows", type=int, default=ROWS, help="Linhas dos labirintos")
+    parser.add_argument("--cols", type=int, default=COLS, help="Colunas dos labirintos")
+    parser.add_argument("--fused", action="store_true",
+                        help="Episódios no laço fundido (game/kernel.py); não suporta --shaping")
+    parser.add_argument("--seed", type=int, default=None, help="Seed dos sorteios de exploração (--fused)")
+    parser.add_argument("--record-every", type=int, default=0,
+                        help="Grava um episódio a cada N para o replay (0 desativa)")
+    parser.add_argument("--record-path", default=TRAJECTORY_PATH)
+    parser.add_argument("--dataset", default=None,
+                        help="Treina nos labirintos de um conjunto pré-gerado (game.maze_dataset)")
+    parser.add_argument("--split", default="train", help="Partição do conjunto usada no treino")
+    parser.add_argument("--shuffle-seed", type=int, default=None,
+                        help="Embaralha a ordem dos labirintos do conjunto (reprodutível)")
+    parser.add_argument("--eval-mazes", type=int, default=0,
+                        help="Avalia a política gulosa em N labirintos fixos ao final (0 desativa)")
+    args = parser.parse_args()
+
+    pool = dataset = None
+    if args.dataset:
+        from .maze_dataset import MazeDataset
+        dataset = MazeDataset(args.dataset, split=args.split, shuffle_seed=args.shuffle_seed)
+        args.rows, args.cols = dataset.rows, dataset.cols
+    elif args.prefetch:
+        from .maze_pool import MazePool
+        pool = MazePool(depth=args.prefetch, workers=args.prefetch_workers, processes=True,
+                        rows=args.rows, cols=args.cols)
+
+    replay = ReplayBuffer(args.replay_capacity, args.replay_ratio) if args.replay_ratio else None
+    dyna = DynaModel(args.dyna_steps) if args.dyna_steps else None
+    source = dataset if dataset is not None else pool
+    trainer = HeadlessTrainer(env=Environment(QLearningAgent(storage="dense"), maze_source=source,
+                                              shaping=args.shaping, rows=args.rows, cols=args.cols),
+                              replay=replay, dyna=dyna, fused=args.fused, seed=args.seed)
+    if args.record_every:
+        from .trajectory import TrajectoryRecorder
+        trainer.recorder = TrajectoryRecorder(args.record_path, args.record_every)
+    episodes = args.episodes
+    checkpoint = None
+    if args.resume:
+        from .autosave import latest_autosave
+        checkpoint = latest_autosave()
+        if checkpoint is None:
+            print("Nenhum salvamento automático encontrado; começando do modelo salvo")
+    if checkpoint is not None:
+        trainer.resume(checkpoint)
+        episodes = max(args.episodes - trainer.episodes, 0)  # --episodes é o total do treino
+    elif not args.no_load:
+        trainer.agent.load_model()
+    if args.autosave_episodes or args.autosave_seconds:
+        from .autosave import AutoSaver
+        trainer.autosaver = AutoSaver(trainer.snapshot, args.autosave_episodes,
+                                      args.autosave_seconds, args.autosave_keep,
+                                      start_episode=trainer.episodes)
+    try:
+        trainer.train(episodes=episodes, log_every=args.log_every)
+    finally:
+        if trainer.autosaver is not None:
+            trainer.autosaver.close()
+            print(f"Salvamento automático: {trainer.autosaver.stats()}")
+        if pool is not None:
+            print(f"Fila de labirintos: {pool.stats()}")
+            pool.close()
+        if trainer.recorder is not None:
+            trainer.recorder.close()
+            print(f"Trajetórias: {trainer.recorder.recorded} episódios gravados em {trainer.recorder.path} "
+                  f"({trainer.recorder.bytes_written} bytes)")
+    trainer.agent.save_model()
+    if args.eval_mazes:
+        from .evaluation import evaluate, format_report
+        # Com conjunto, avalia na partição de teste dele (labirintos nunca vistos no treino)
+        test = None
+        if dataset is not None and args.split != "test":
+            test = MazeDataset(args.dataset, split="test")
+            test = test if len(test) else None
+        report = evaluate(trainer.agent, args.eval_mazes, dataset=test, rows=args.rows, cols=args.cols)
+        print(f"Avaliação: {format_report(report)}")
+
+
+if __name__ == "__main__":
+    main()
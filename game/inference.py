@@ -0,0 +1,61 @@
+from pathlib import Path
+import numpy as np
+from .agent import NUM_STATES, NUM_ACTIONS, STATE_LIMIT, STATE_SIDE
+from .checkpoint import read_checkpoint, migrate_legacy
+
+
+class FrozenPolicy:
+    """
+    Política gulosa congelada para servir uma Q-table treinada (sem epsilon nem
+    aprendizado). As ações gulosas de todos os estados são pré-calculadas numa tabela
+    (STATE_SIDE, STATE_SIDE) de uint8, então act_batch é só aritmética vetorizada e uma
+    indexação. Carregada com load(), a Q-table é o np.memmap somente leitura do
+    checkpoint: vários processos servindo o mesmo arquivo compartilham as páginas
+    do cache do sistema, sem cópia por processo.
+    """
+
+    def __init__(self, q_values):
+        if not isinstance(q_values, np.ndarray):
+            q_values = np.asarray(q_values)
+        if q_values.shape != (NUM_STATES, NUM_ACTIONS):
+            raise ValueError(f"Q-table com formato inesperado: {q_values.shape}")
+        self.q_values = q_values
+        # Empate: primeira ação, como choose_action/greedy_action_index
+        self.greedy = np.ascontiguousarray(q_values.argmax(axis=1).astype(np.uint8).reshape(STATE_SIDE, STATE_SIDE))
+
+    @classmethod
+    def load(cls, path="save/q_learning_model.ckpt"):
+        """Lê o modelo salvo (QLearningAgent.save_model); migra o .pkl antigo se necessário"""
+        path = Path(path)
+        if not path.exists() and path.with_suffix(".pkl").exists():
+            migrate_legacy(path.parent)
+        meta, arrays = read_checkpoint(path)
+        return cls(arrays['q_table'])
+
+    @classmethod
+    def from_agent(cls, agent):
+        """Cópia congelada da Q-table atual de um QLearningAgent (o agente pode continuar treinando)"""
+        return cls(np.array(agent.q_array(), dtype=np.float64))
+
+    def act_batch(self, agent_positions, checkpoint_positions, out=None):
+        """
+        Ações gulosas para N agentes: agent_positions e checkpoint_positions são arrays
+        (N, 2) de (linha, coluna). Mesma codificação de get_state_key: (dx, dy) limitados
+        a [-5, 5]. Retorna um array (N,) de uint8 (ou escreve em out).
+        """
+        delta = np.subtract(checkpoint_positions, agent_positions, dtype=np.int64)
+        np.clip(delta, -STATE_LIMIT, STATE_LIMIT, out=delta)
+        delta += STATE_LIMIT
+        # Linhas da tabela: dx (diferença de colunas); colunas: dy (diferença de linhas)
+        return np.take(self.greedy, delta[:, 1] * STATE_SIDE + delta[:, 0], out=out)
+
+    def act_states(self, states):
+        """Ações gulosas para um array (N, 2) de estados (dx, dy) já codificados"""
+        states = np.asarray(states)
+        return self.greedy[states[:, 0] + STATE_LIMIT, states[:, 1] + STATE_LIMIT]
+
+    def act(self, agent_pos, checkpoint_pos):
+        """Ação gulosa de um único agente"""
+        dx = max(min(checkpoint_pos[1] - agent_pos[1], STATE_LIMIT), -STATE_LIMIT)
+        dy = max(min(checkpoint_pos[0] - agent_pos[0], STATE_LIMIT), -STATE_LIMIT)
+        return int(self.greedy[dx + STATE_LIMIT, dy + STATE_LIMIT])
@@ -0,0 +1,156 @@
+import time
+from pathlib import Path
+
+PHASES = ("reset", "events", "choose_action", "move", "learn", "render", "metrics", "autosave", "record")
+
+
+class PhaseStats:
+    """
+    Cronômetros e contadores por fase do loop de treino (reset, eventos, choose_action,
+    move, learn, render, métricas, salvamento automático). O loop chama mark() e
+    lap(fase): cada lap atribui à fase o tempo desde a marca anterior. Desativado
+    (Game.enable_instrumentation não chamado), o loop usa NULL_TIMER e não mede nada.
+    """
+
+    def __init__(self, log_every=100):
+        self.log_every = log_every
+        self.reset()
+
+    def reset(self):
+        self.times = dict.fromkeys(PHASES, 0.0)
+        self.counts = dict.fromkeys(PHASES, 0)
+        self.episodes = 0
+        self.steps = 0
+        self.start = time.perf_counter()
+        self._last = self.start
+
+    def mark(self):
+        self._last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.add(phase, now - self._last)
+        self._last = now
+
+    def add(self, phase, elapsed, count=1):
+        self.times[phase] = self.times.get(phase, 0.0) + elapsed
+        self.counts[phase] = self.counts.get(phase, 0) + count
+
+    def episode_done(self, steps):
+        self.episodes += 1
+        self.steps += steps
+
+    def summary(self):
+        """Passos/s, episódios/s e, por fase, tempo total, chamadas e fração do tempo"""
+        elapsed = time.perf_counter() - self.start
+        measured = sum(self.times.values())
+        phases = {}
+        for phase, total in self.times.items():
+            count = self.counts[phase]
+            phases[phase] = {
+                'time': total,
+                'count': count,
+                'share': total / elapsed if elapsed > 0 else 0.0,
+                'mean_us': total / count * 1e6 if count else 0.0,
+            }
+        return {
+            'elapsed': elapsed,
+            'episodes': self.episodes,
+            'steps': self.steps,
+            'episodes_per_sec': self.episodes / elapsed if elapsed > 0 else 0.0,
+            'steps_per_sec': self.steps / elapsed if elapsed > 0 else 0.0,
+            # Tempo fora das fases medidas (laço, históricos, print...)
+            'other_share': 1.0 - measured / elapsed if elapsed > 0 else 0.0,
+            'phases': phases,
+        }
+
+    def format(self):
+        summary = self.summary()
+        shares = ", ".join(f"{phase} {info['share'] * 100:.0f}%"
+                           for phase, info in summary['phases'].items() if info['count'])
+        return (f"Passos/s: {summary['steps_per_sec']:.0f}, Episódios/s: {summary['episodes_per_sec']:.1f} "
+                f"| {shares}, outros {summary['other_share'] * 100:.0f}%")
+
+    def maybe_log(self, episode):
+        if self.log_every and episode % self.log_every == 0:
+            print(f"Instrumentação (episódio {episode}): {self.format()}")
+
+
+class NullTimer:
+    """Mesma interface de PhaseStats usada pelo loop, sem medir nada (instrumentação desligada)"""
+
+    def mark(self):
+        pass
+
+    def lap(self, phase):
+        pass
+
+    def episode_done(self, steps):
+        pass
+
+    def maybe_log(self, episode):
+        pass
+
+
+NULL_TIMER = NullTimer()
+
+
+class ProfileWindow:
+    """
+    Anexa cProfile ou tracemalloc a uma janela de N episódios e grava o resultado em disco
+    (.prof para pstats/snakeviz; .tracemalloc para tracemalloc.Snapshot.load).
+    """
+
+    def __init__(self, episodes=100, kind="cprofile", path=None, top=15):
+        if kind not in ("cprofile", "tracemalloc"):
+            raise ValueError(f"Perfilador desconhecido: {kind}")
+        self.episodes = episodes
+        self.kind = kind
+        suffix = ".prof" if kind == "cprofile" else ".tracemalloc"
+        self.path = Path(path) if path is not None else \
+            Path("save") / "profiles" / f"{kind}-{time.strftime('%Y%m%d-%H%M%S')}{suffix}"
+        self.top = top
+        self.remaining = episodes
+        self._profiler = None
+        self._started_tracemalloc = False
+
+    def start(self):
+        if self.kind == "cprofile":
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(25)
+                self._started_tracemalloc = True
+        print(f"Perfilando {self.episodes} episódios com {self.kind}...")
+        return self
+
+    def episode_done(self):
+        """Chamado a cada episódio; retorna True quando a janela terminou (e foi gravada)"""
+        self.remaining -= 1
+        if self.remaining > 0:
+            return False
+        self.stop()
+        return True
+
+    def stop(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.kind == "cprofile":
+            import io
+            import pstats
+            self._profiler.disable()
+            self._profiler.dump_stats(self.path)
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(self.top)
+            self.path.with_suffix(".txt").write_text(out.getvalue())
+        else:
+            import tracemalloc
+            snapshot = tracemalloc.take_snapshot()
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+            snapshot.dump(str(self.path))
+            lines = [str(stat) for stat in snapshot.statistics("lineno")[:self.top]]
+            self.path.with_suffix(".txt").write_text("\n".join(lines) + "\n")
+        print(f"Perfil salvo em {self.path} (resumo em {self.path.with_suffix('.txt')})")
@@ -0,0 +1,228 @@
+import numpy as np
+from .roadmap import RoadMap
+from .agent import NUM_ACTIONS, STATE_LIMIT, STATE_SIDE, state_to_index
+from .environment import ACTION_DR, ACTION_DC, MAX_EPISODE_STEPS
+from .constants import ROWS, COLS
+
+UNIFORM_BLOCK = 4096  # Uniformes sorteados por vez (par: 2 por passo)
+
+
+class UniformBlocks:
+    """
+    Sorteios de exploração em blocos de um numpy.random.Generator com seed. Cada passo
+    consome exatamente um par (u_explorar, u_ação), nos dois caminhos de episódio, então
+    a sequência não depende de onde os blocos começam ou de quando o episódio termina.
+    """
+
+    def __init__(self, seed=None, block=UNIFORM_BLOCK):
+        if block % 2:
+            raise ValueError("O bloco de uniformes precisa ter tamanho par")
+        self.rng = np.random.default_rng(seed)
+        self.block = block
+        self.buffer = []
+        self.pos = 0
+
+    def refill(self):
+        # Lista de floats Python: indexar é bem mais barato que escalares do NumPy
+        self.buffer = self.rng.random(self.block).tolist()
+        self.pos = 0
+        return self.buffer
+
+    def pair(self):
+        if self.pos == len(self.buffer):
+            self.refill()
+        pos = self.pos
+        self.pos = pos + 2
+        return self.buffer[pos], self.buffer[pos + 1]
+
+
+class SeededMazes:
+    """Fonte de labirintos (next_roadmap) determinística: RoadMap(seed=seed + i)"""
+
+    def __init__(self, seed=0, rows=ROWS, cols=COLS):
+        self.seed = seed
+        self.rows, self.cols = rows, cols
+        self.served = 0
+
+    def next_roadmap(self):
+        roadmap = RoadMap(seed=self.seed + self.served, rows=self.rows, cols=self.cols)
+        self.served += 1
+        return roadmap
+
+
+def run_episode_reference(env, agent, uniforms, transitions=None):
+    """
+    Episódio pelo caminho de referência (move_agent, get_state, learn_index), com a
+    exploração vinda de uniforms: explora se u_explorar < epsilon, com ação int(u_ação * 4).
+    Retorna a recompensa total; transitions (5 listas) recebe as transições por índice.
+    """
+    state = env.reset()
+    total_reward = 0
+    done = False
+
+    while not done and env.steps < MAX_EPISODE_STEPS:
+        explore, pick = uniforms.pair()
+        s = state_to_index(state)
+        action = int(pick * NUM_ACTIONS) if explore < agent.epsilon else agent.greedy_action_index(s)
+        reward, done = env.move_agent(action)
+        state = env.get_state()
+        ns = state_to_index(state)
+        agent.learn_index(s, action, reward, ns)
+        if transitions is not None:
+            transitions[0].append(s)
+            transitions[1].append(action)
+            transitions[2].append(reward)
+            transitions[3].append(ns)
+            transitions[4].append(done)
+        total_reward += reward
+
+    return total_reward
+
+
+def run_episode_fused(env, agent, uniforms, transitions=None):
+    """
+    Mesmo episódio de run_episode_reference (bit a bit, para os mesmos uniforms) num
+    único laço sobre variáveis locais: grade, checkpoints, Q-table e sorteios sem
+    chamadas de método por passo. Requer agente denso e ambiente sem shaping.
+    """
+    if not agent.dense:
+        raise ValueError("O episódio fundido requer o agente com storage='dense'")
+    if env.shaping:
+        raise ValueError("O episódio fundido não suporta shaping")
+    env.reset()
+    roadmap = env.roadmap
+    rows, cols = roadmap.rows, roadmap.cols
+    road = memoryview(roadmap.grid.reshape(-1))
+    checkpoints = roadmap.checkpoints
+    num_checkpoints = len(checkpoints)
+    q = agent._q
+    alpha, gamma, epsilon = agent.alpha, agent.gamma, agent.epsilon
+    record = transitions is not None
+    buffer, pos = uniforms.buffer, uniforms.pos
+    size = len(buffer)
+    action_dr, action_dc = ACTION_DR, ACTION_DC
+    limit, side = STATE_LIMIT, STATE_SIDE
+
+    row, col = env.agent_pos
+    checkpoint = 0
+    completed = False
+    if num_checkpoints:
+        target_row, target_col = checkpoints[0]
+        dx = min(max(target_col - col, -limit), limit)
+        dy = min(max(target_row - row, -limit), limit)
+        s = (dx + limit) * side + (dy + limit)
+    else:
+        s = limit * side + limit  # Estado (0, 0)
+    steps = 0
+    total_reward = 0
+    done = False
+
+    while not done and steps < MAX_EPISODE_STEPS:
+        if pos == size:
+            buffer = uniforms.refill()
+            pos, size = 0, len(buffer)
+        explore = buffer[pos]
+        pick = buffer[pos + 1]
+        pos += 2
+
+        base = s * NUM_ACTIONS
+        if explore < epsilon:
+            action = int(pick * NUM_ACTIONS)
+        else:
+            action, best_q = 0, q[base]
+            value = q[base + 1]
+            if value > best_q:
+                action, best_q = 1, value
+            value = q[base + 2]
+            if value > best_q:
+                action, best_q = 2, value
+            if q[base + 3] > best_q:
+                action = 3
+
+        new_row = row + action_dr[action]
+        new_col = col + action_dc[action]
+
+        if 0 <= new_row < rows and 0 <= new_col < cols and road[new_row * cols + new_col] == 1:
+            row, col = new_row, new_col
+            steps += 1
+            reward = -0.1
+            if num_checkpoints and row == target_row and col == target_col:
+                reward = 10
+                checkpoint += 1
+                if checkpoint >= num_checkpoints:
+                    reward = 20
+                    done = True
+                    completed = True
+                else:
+                    target_row, target_col = checkpoints[checkpoint]
+        else:
+            reward = -10
+            done = True
+
+        if num_checkpoints:
+            # get_state_key com o limite em comparações simples (min/max são chamadas)
+            dx = target_col - col
+            if dx > limit:
+                dx = limit
+            elif dx < -limit:
+                dx = -limit
+            dy = target_row - row
+            if dy > limit:
+                dy = limit
+            elif dy < -limit:
+                dy = -limit
+            ns = (dx + limit) * side + (dy + limit)
+        else:
+            ns = s
+
+        # learn_index em linha
+        next_base = ns * NUM_ACTIONS
+        best_next = max(q[next_base], q[next_base + 1], q[next_base + 2], q[next_base + 3])
+        i = base + action
+        q[i] += alpha * (reward + gamma * best_next - q[i])
+
+        if record:
+            transitions[0].append(s)
+            transitions[1].append(action)
+            transitions[2].append(reward)
+            transitions[3].append(ns)
+            transitions[4].append(done)
+        s = ns
+        total_reward += reward
+
+    uniforms.pos = pos
+    env.agent_pos = (row, col)
+    env.steps = steps
+    env.completed = completed
+    # get_state limita o checkpoint atual ao último após completar
+    roadmap.current_checkpoint = min(checkpoint, num_checkpoints - 1) if num_checkpoints else 0
+    return total_reward
+
+
+def verify(episodes=200, seed=0, rows=ROWS, cols=COLS):
+    """
+    Roda os dois caminhos com os mesmos labirintos e sorteios e compara recompensas,
+    passos, posições finais e a Q-table byte a byte. Retorna o primeiro episódio
+    divergente (ou None).
+    """
+    from .agent import QLearningAgent
+    from .environment import Environment
+
+    runs = []
+    for runner in (run_episode_reference, run_episode_fused):
+        agent = QLearningAgent(storage="dense")
+        env = Environment(agent, maze_source=SeededMazes(seed, rows, cols), rows=rows, cols=cols)
+        runs.append((runner, env, agent, UniformBlocks(seed)))
+
+    for episode in range(episodes):
+        results = []
+        for runner, env, agent, uniforms in runs:
+            transitions = ([], [], [], [], [])
+            total_reward = runner(env, agent, uniforms, transitions)
+            agent.decay_epsilon()
+            results.append((total_reward, env.steps, env.agent_pos, env.completed,
+                            env.roadmap.current_checkpoint, transitions, uniforms.pos,
+                            agent.q_values.tobytes()))
+        if results[0] != results[1]:
+            return episode
+    return None
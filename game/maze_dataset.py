@@ -0,0 +1,204 @@
+import os
+import random
+import time
+from pathlib import Path
+import numpy as np
+from .roadmap import RoadMap, MazeSpec
+from .checkpoint import allocate_checkpoint, read_checkpoint, pack_grid, unpack_grid
+from .constants import *
+
+# Conjunto de labirintos pré-gerados num checkpoint (game/checkpoint.py), kind 'mazes':
+#   grids: bits de cada labirinto (np.packbits, alinhado em byte por labirinto)
+#   offsets: início de cada labirinto em grids (count + 1 entradas, a última é o fim)
+#   checkpoints: (count, MAX_CHECKPOINTS, 2) linha/coluna; num_checkpoints: quantos valem
+#   starts: (count, 2) célula inicial
+# O labirinto i é exatamente RoadMap(seed=seed + i): mesmos argumentos geram o mesmo arquivo
+# em qualquer máquina, e as partições (treino/teste) são faixas fixas de índices.
+MAX_CHECKPOINTS = 3
+BUILD_CHUNK = 4096  # Labirintos por tarefa de cada processo
+
+
+def _build_chunk(path, sections, seed, rows, cols, start, stop):
+    """Gera os labirintos [start, stop) e escreve direto nas seções mapeadas do arquivo"""
+    def section(name):
+        info = sections[name]
+        return np.memmap(path, dtype=info['dtype'], mode='r+', offset=info['offset'],
+                         shape=tuple(info['shape']))
+
+    grids, offsets = section('grids'), section('offsets')
+    checkpoints, num_checkpoints, starts = section('checkpoints'), section('num_checkpoints'), section('starts')
+    for i in range(start, stop):
+        roadmap = RoadMap(seed=seed + i, rows=rows, cols=cols)
+        packed = pack_grid(roadmap.grid)
+        offset = int(offsets[i])
+        grids[offset:offset + packed.size] = packed
+        count = min(len(roadmap.checkpoints), MAX_CHECKPOINTS)
+        checkpoints[i, :count] = roadmap.checkpoints[:count]
+        num_checkpoints[i] = count
+        starts[i] = roadmap.start_pos
+    for array in (grids, checkpoints, num_checkpoints, starts):
+        array.flush()
+    return stop - start
+
+
+def _build_star(task):
+    return _build_chunk(*task)
+
+
+def build_dataset(path=DATASET_PATH, count=100000, rows=ROWS, cols=COLS, seed=0,
+                  test_fraction=0.1, workers=None, chunk=BUILD_CHUNK, progress=None):
+    """
+    Gera count labirintos em paralelo (workers processos, cada um escrevendo seus blocos
+    no arquivo mapeado, sem passar os grids pelo processo principal) e publica o arquivo
+    de forma atômica. As últimas round(count * test_fraction) entradas formam a partição
+    de teste. progress(feitos, total) é chamado a cada bloco concluído.
+    """
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    stride = (rows * cols + 7) // 8
+    num_test = int(round(count * test_fraction))
+    meta = {
+        'kind': 'mazes',
+        'count': count,
+        'rows': rows,
+        'cols': cols,
+        'seed': seed,
+        'splits': {'train': [0, count - num_test], 'test': [count - num_test, count]},
+    }
+    sections = allocate_checkpoint(tmp, meta, {
+        'grids': (np.uint8, (count * stride,)),
+        'offsets': (np.uint64, (count + 1,)),
+        'checkpoints': (np.uint32, (count, MAX_CHECKPOINTS, 2)),
+        'num_checkpoints': (np.uint8, (count,)),
+        'starts': (np.uint32, (count, 2)),
+    })
+    # Todos os labirintos têm o mesmo tamanho; o índice de offsets mantém o formato
+    # aberto a conjuntos com tamanhos variados
+    offsets = np.memmap(tmp, dtype=np.uint64, mode='r+', offset=sections['offsets']['offset'],
+                        shape=(count + 1,))
+    offsets[:] = np.arange(count + 1, dtype=np.uint64) * stride
+    offsets.flush()
+    del offsets
+
+    tasks = [(str(tmp), sections, seed, rows, cols, start, min(start + chunk, count))
+             for start in range(0, count, chunk)]
+    workers = min(workers or os.cpu_count() or 1, max(len(tasks), 1))
+    done = 0
+    if workers == 1:
+        for task in tasks:
+            done += _build_chunk(*task)
+            if progress is not None:
+                progress(done, count)
+    else:
+        import multiprocessing as mp
+        with mp.Pool(workers) as pool:
+            for built in pool.imap_unordered(_build_star, tasks):
+                done += built
+                if progress is not None:
+                    progress(done, count)
+
+    with open(tmp, 'rb+') as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return meta
+
+
+class MazeDataset:
+    """
+    Labirintos pré-gerados lidos do arquivo mapeado em memória: abrir não lê os grids,
+    e roadmap(i) só toca as páginas do labirinto i (o grid é desempacotado dos bits,
+    os checkpoints e o início vêm direto do mapa). Serve como maze_source
+    (next_roadmap) de Environment/Game/HeadlessTrainer, percorrendo a partição em
+    ordem fixa; com shuffle_seed a ordem é embaralhada de forma reprodutível.
+    """
+
+    def __init__(self, path=DATASET_PATH, split=None, shuffle_seed=None):
+        self.path = Path(path)
+        self.meta, arrays = read_checkpoint(self.path)
+        if self.meta.get('kind') != 'mazes':
+            raise ValueError(f"{self.path} não é um conjunto de labirintos")
+        self.rows, self.cols = self.meta['rows'], self.meta['cols']
+        self.seed = self.meta['seed']
+        # Vistas ndarray dos mapas (sem cópia): evitam o custo de np.memmap em cada fatia
+        self.grids, self.offsets, self.checkpoints, self.num_checkpoints, self.starts = (
+            arrays[name].view(np.ndarray) for name in ('grids', 'offsets', 'checkpoints', 'num_checkpoints', 'starts'))
+        if split is not None and split not in self.meta['splits']:
+            raise ValueError(f"Partição desconhecida: {split} (disponíveis: {', '.join(self.meta['splits'])})")
+        self.split = split
+        self.start, self.stop = self.meta['splits'][split] if split is not None else (0, self.meta['count'])
+        self.order = None
+        if shuffle_seed is not None:
+            self.order = list(range(len(self)))
+            random.Random(shuffle_seed).shuffle(self.order)
+        self.served = 0
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def _global_index(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError(f"Labirinto {index} fora da partição ({len(self)} labirintos)")
+        return self.start + index % len(self)
+
+    def spec(self, index):
+        """MazeSpec do labirinto index (relativo à partição)"""
+        i = self._global_index(index)
+        start, stop = int(self.offsets[i]), int(self.offsets[i + 1])
+        grid = unpack_grid(self.grids[start:stop], (self.rows, self.cols))
+        count = int(self.num_checkpoints[i])
+        return MazeSpec(grid, self.checkpoints[i, :count].tolist(), self.starts[i].tolist())
+
+    def roadmap(self, index):
+        """RoadMap do labirinto index; a seed é preservada (trajetórias gravam só ela)"""
+        roadmap = RoadMap.from_spec(self.spec(index))
+        roadmap.seed = self.seed + self._global_index(index)
+        return roadmap
+
+    __getitem__ = roadmap
+
+    def next_roadmap(self):
+        """Próximo labirinto da partição; recomeça do início ao chegar ao fim"""
+        position = self.served % len(self)
+        self.served += 1
+        return self.roadmap(self.order[position] if self.order is not None else position)
+
+    def info(self):
+        splits = ", ".join(f"{name}: {stop - start}" for name, (start, stop) in self.meta['splits'].items())
+        size = self.path.stat().st_size
+        return (f"{self.meta['count']} labirintos {self.rows}x{self.cols} (seeds {self.seed}.."
+                f"{self.seed + self.meta['count'] - 1}), {splits}, {size / 1e6:.1f} MB "
+                f"({size / max(self.meta['count'], 1):.0f} bytes/labirinto)")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Gera ou inspeciona um conjunto de labirintos pré-gerados")
+    parser.add_argument("path", nargs="?", default=DATASET_PATH, help="Arquivo do conjunto")
+    parser.add_argument("--info", action="store_true", help="Só mostra o resumo de um conjunto existente")
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--rows", type=int, default=ROWS, help="Linhas dos labirintos")
+    parser.add_argument("--cols", type=int, default=COLS, help="Colunas dos labirintos")
+    parser.add_argument("--seed", type=int, default=0, help="O labirinto i é RoadMap(seed=seed + i)")
+    parser.add_argument("--test-fraction", type=float, default=0.1,
+                        help="Fração final dos labirintos reservada para avaliação")
+    parser.add_argument("--workers", type=int, default=None, help="Processos (padrão: todos os núcleos)")
+    args = parser.parse_args()
+
+    if not args.info:
+        start = time.perf_counter()
+        last = [start]
+
+        def progress(done, total):
+            now = time.perf_counter()
+            if now - last[0] >= 1.0 or done == total:
+                last[0] = now
+                print(f"{done}/{total} labirintos ({done / (now - start):.0f}/s)")
+
+        build_dataset(args.path, args.count, args.rows, args.cols, args.seed,
+                      args.test_fraction, args.workers, progress=progress)
+    print(MazeDataset(args.path).info())
+
+
+if __name__ == "__main__":
+    main()
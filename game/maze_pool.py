@@ -0,0 +1,84 @@
+import queue
+import threading
+import time
+import multiprocessing as mp
+from .roadmap import RoadMap
+from .constants import ROWS, COLS
+
+
+def _produce(out_queue, stop_event, seed, worker_id, num_workers, rows=ROWS, cols=COLS):
+    """Gera labirintos continuamente até stop_event; bloqueia quando a fila está cheia"""
+    index = 0
+    while not stop_event.is_set():
+        maze_seed = None if seed is None else seed + worker_id + index * num_workers
+        spec = RoadMap(seed=maze_seed, rows=rows, cols=cols).to_spec()
+        index += 1
+        while not stop_event.is_set():
+            try:
+                out_queue.put(spec, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+
+
+class MazePool:
+    """
+    Produtores (threads ou processos) que pré-geram labirintos em uma fila limitada.
+    reset() só retira o próximo MazeSpec; stats() informa quantas vezes o consumidor
+    precisou esperar.
+    """
+
+    def __init__(self, depth=64, workers=1, processes=False, seed=None, rows=ROWS, cols=COLS):
+        self.depth = depth
+        self.rows, self.cols = rows, cols
+        self.served = 0
+        self.waits = 0
+        self.wait_time = 0.0
+
+        if processes:
+            self.queue = mp.Queue(maxsize=depth)
+            self.stop_event = mp.Event()
+            make_worker = mp.Process
+        else:
+            self.queue = queue.Queue(maxsize=depth)
+            self.stop_event = threading.Event()
+            make_worker = threading.Thread
+
+        self.workers = [
+            make_worker(target=_produce, args=(self.queue, self.stop_event, seed, i, workers, rows, cols),
+                        daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def get(self):
+        """Próximo MazeSpec da fila"""
+        try:
+            spec = self.queue.get_nowait()
+        except queue.Empty:
+            # Consumidor mais rápido que os produtores: registra a espera
+            self.waits += 1
+            start = time.perf_counter()
+            spec = self.queue.get()
+            self.wait_time += time.perf_counter() - start
+        self.served += 1
+        return spec
+
+    def next_roadmap(self):
+        return RoadMap.from_spec(self.get())
+
+    def stats(self):
+        return {
+            'served': self.served,
+            'waits': self.waits,
+            'wait_time': self.wait_time,
+            'wait_rate': self.waits / self.served if self.served else 0.0,
+        }
+
+    def close(self):
+        self.stop_event.set()
+        for worker in self.workers:
+            worker.join(timeout=1.0)
+            if isinstance(worker, mp.Process) and worker.is_alive():
+                worker.terminate()
@@ -1,88 +1,286 @@
-import matplotlib.pyplot as plt
-from multiprocessing import Process, Pipe
+from multiprocessing import Process, RawArray, RawValue
 import numpy as np
 import signal
+import time
+
+REDRAW_INTERVAL = 0.25  # Segundos mínimos entre redesenhos do gráfico
+MAX_PLOT_BUCKETS = 2000  # Pontos (pares min/max) por série, independente do tamanho do treino
+RING_CAPACITY = 8192  # Registros de episódio no buffer circular compartilhado
+RECORD_FIELDS = 4  # (episódio, recompensa, média, epsilon)
+
+
+class MetricsRing:
+    """
+    Buffer circular em memória compartilhada entre o treino (escritor) e o processo de
+    métricas (leitor). O escritor nunca bloqueia: se o leitor atrasar, os registros mais
+    antigos são sobrescritos e contados em dropped.
+    """
+
+    def __init__(self, capacity=RING_CAPACITY):
+        self.capacity = capacity
+        self.records = RawArray('d', capacity * RECORD_FIELDS)
+        self.head = RawValue('q', 0)  # Total de registros escritos
+        self.dropped = RawValue('q', 0)  # Sobrescritos antes da leitura (contado pelo leitor)
+        self.coalesced = RawValue('q', 0)  # Lidos mas agrupados num único redesenho
+        self.closed = RawValue('b', 0)
+        self._view = None
+
+    def __getstate__(self):
+        # A visão NumPy é recriada em cada processo sobre a mesma memória
+        state = self.__dict__.copy()
+        state['_view'] = None
+        return state
+
+    def view(self):
+        if self._view is None:
+            self._view = np.frombuffer(self.records, dtype=np.float64).reshape(self.capacity, RECORD_FIELDS)
+        return self._view
+
+    def write(self, episode, reward, avg, epsilon):
+        head = self.head.value
+        self.view()[head % self.capacity] = (episode, reward, avg, epsilon)
+        self.head.value = head + 1  # Publica o registro só depois de escrito
+
+    def read(self, tail):
+        """Registros novos desde tail; retorna (array (n, 4), novo tail)"""
+        head = self.head.value
+        if head - tail > self.capacity:
+            self.dropped.value += head - tail - self.capacity
+            tail = head - self.capacity
+        if head == tail:
+            return None, tail
+
+        view = self.view()
+        start, end = tail % self.capacity, head % self.capacity
+        if start < end:
+            data = view[start:end].copy()
+        else:
+            data = np.concatenate((view[start:], view[:end]))
+
+        # O escritor pode ter dado a volta durante a cópia: descarta as linhas sobrescritas,
+        # incluindo a que ele está preenchendo agora (escrita antes de head avançar)
+        overwritten = self.head.value + 1 - self.capacity - tail
+        if overwritten > 0:
+            self.dropped.value += overwritten
+            data = data[overwritten:]
+            if len(data) == 0:
+                return None, head
+        return data, head
+
+
+class MinMaxDownsampler:
+    """
+    Histórico de tamanho fixo: cada bucket guarda o mínimo e o máximo de um intervalo
+    de episódios. Quando enche, buckets vizinhos são fundidos e a largura dobra,
+    mantendo o custo por quadro constante em treinos de milhões de episódios.
+    """
+
+    def __init__(self, capacity=MAX_PLOT_BUCKETS):
+        self.capacity = capacity + capacity % 2  # Par: a fusão em pares não perde buckets
+        self.width = 1  # Episódios por bucket
+        self.count = 0  # Buckets completos
+        self.x = np.empty(self.capacity)
+        self.vmin = np.empty(self.capacity)
+        self.vmax = np.empty(self.capacity)
+        self._pending = 0
+        self._pending_x = 0.0
+        self._pending_min = 0.0
+        self._pending_max = 0.0
+
+    def append(self, x, value):
+        if self._pending == 0:
+            self._pending_x = x
+            self._pending_min = self._pending_max = value
+        else:
+            self._pending_min = min(self._pending_min, value)
+            self._pending_max = max(self._pending_max, value)
+        self._pending += 1
+        if self._pending < self.width:
+            return
+
+        if self.count == self.capacity:
+            self._merge()
+            if self._pending < self.width:
+                return  # O bucket pendente passa a ter a nova largura
+        i = self.count
+        self.x[i] = self._pending_x
+        self.vmin[i] = self._pending_min
+        self.vmax[i] = self._pending_max
+        self.count += 1
+        self._pending = 0
+
+    def _merge(self):
+        half = self.count // 2
+        self.vmin[:half] = np.minimum(self.vmin[0:2 * half:2], self.vmin[1:2 * half:2])
+        self.vmax[:half] = np.maximum(self.vmax[0:2 * half:2], self.vmax[1:2 * half:2])
+        self.x[:half] = self.x[0:2 * half:2]
+        self.count = half
+        self.width *= 2
+
+    def series(self):
+        """Pontos (x, y) em zigue-zague min/max, preservando os extremos de cada bucket"""
+        n = self.count
+        xs = np.repeat(self.x[:n], 2)
+        ys = np.empty(2 * n)
+        ys[0::2] = self.vmin[:n]
+        ys[1::2] = self.vmax[:n]
+        if self._pending:
+            xs = np.append(xs, [self._pending_x, self._pending_x])
+            ys = np.append(ys, [self._pending_min, self._pending_max])
+        return xs, ys
+
+
+def _expand_limits(low, high, values, margin=0.1):
+    """Novos limites se os valores saírem dos atuais (com folga, para redesenhar raramente)"""
+    vmin, vmax = float(np.min(values)), float(np.max(values))
+    if vmin >= low and vmax <= high:
+        return None
+    span = max(vmax - vmin, 1.0)
+    return min(low, vmin - margin * span), max(high, vmax + margin * span)
+
+
+def metrics_process(ring):
+    # matplotlib (e o Qt) só são importados aqui, no processo de métricas
+    import matplotlib.pyplot as plt
 
-def metrics_process(conn):
     # Configuração para evitar que o matplotlib trave
     plt.switch_backend('QtAgg')  # Ou 'TkAgg' se não funcionar
-    
+
     # Configurar handler para ignorar Ctrl+C
     signal.signal(signal.SIGINT, signal.SIG_IGN)
-    
+
     try:
         # Estilo do gráfico
         plt.style.use('ggplot')
-        
+
         # Criar figura e eixos
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 6))
         plt.subplots_adjust(hspace=0.5)
         fig.canvas.manager.set_window_title('Métricas de Treinamento')
-        
-        rewards_history = []
-        avg_history = []
-        epsilon_history = []
-        
-        while True:
-            if conn.poll(0.1):
-                data = conn.recv()
-                if data == 'close':
-                    plt.close('all')
-                    break
-                
-                episode, reward, avg, epsilon = data
-                rewards_history.append(reward)
-                avg_history.append(avg)
-                epsilon_history.append(epsilon)
-                
-                # Atualizar gráfico de recompensas
-                ax1.clear()
-                ax1.plot(rewards_history, 'b-', label='Recompensa')
-                ax1.plot(avg_history, 'r-', label='Média (100 eps)')
-                ax1.set_title(f'Episódio: {episode} | Recompensa: {reward:.1f} | Média: {avg:.1f}')
-                ax1.set_xlabel('Episódio')
-                ax1.set_ylabel('Recompensa')
-                ax1.legend()
-                ax1.grid(True)
-                
-                # Atualizar gráfico de epsilon
-                ax2.clear()
-                ax2.plot(epsilon_history, 'g-', label='Epsilon')
-                ax2.set_title(f'Exploração: {epsilon:.3f}')
-                ax2.set_xlabel('Episódio')
-                ax2.set_ylabel('Taxa')
-                ax2.legend()
-                ax2.grid(True)
-                
-                plt.pause(0.01)
-                
+        canvas = fig.canvas
+
+        rewards_history = MinMaxDownsampler()
+        avg_history = MinMaxDownsampler()
+        epsilon_history = MinMaxDownsampler()
+
+        # Artistas criados uma vez; cada quadro só atualiza os dados (set_data + blit)
+        reward_line, = ax1.plot([], [], 'b-', label='Recompensa', animated=True)
+        avg_line, = ax1.plot([], [], 'r-', label='Média (100 eps)', animated=True)
+        epsilon_line, = ax2.plot([], [], 'g-', label='Epsilon', animated=True)
+        title1 = ax1.set_title(' ')
+        title2 = ax2.set_title(' ')
+        title1.set_animated(True)
+        title2.set_animated(True)
+        ax1.set_xlabel('Episódio')
+        ax1.set_ylabel('Recompensa')
+        ax1.legend()
+        ax1.grid(True)
+        ax2.set_xlabel('Episódio')
+        ax2.set_ylabel('Taxa')
+        ax2.legend()
+        ax2.grid(True)
+        ax1.set_xlim(0, 100)
+        ax2.set_xlim(0, 100)
+        ax1.set_ylim(-15, 40)
+        ax2.set_ylim(0, 1.05)
+        animated = (reward_line, avg_line, epsilon_line, title1, title2)
+
+        background = None
+
+        def on_draw(event):
+            # Redesenho completo (limites novos, redimensionamento): recaptura o fundo
+            nonlocal background
+            background = canvas.copy_from_bbox(fig.bbox)
+            for artist in animated:
+                fig.draw_artist(artist)
+
+        canvas.mpl_connect('draw_event', on_draw)
+        plt.show(block=False)
+        canvas.draw()
+
+        tail = 0
+        last = None
+        pending = 0  # Registros recebidos desde o último redesenho
+        last_draw = 0.0
+        while not ring.closed.value:
+            # Consome tudo que chegou; o redesenho é limitado por tempo
+            data, tail = ring.read(tail)
+            if data is not None:
+                for episode, reward, avg, epsilon in data.tolist():
+                    rewards_history.append(episode, reward)
+                    avg_history.append(episode, avg)
+                    epsilon_history.append(episode, epsilon)
+                last = data[-1].tolist()
+                pending += len(data)
+
+            now = time.monotonic()
+            if last is None or now - last_draw < REDRAW_INTERVAL:
+                canvas.flush_events()
+                time.sleep(0.02)
+                continue
+
+            episode, reward, avg, epsilon = last
+            episode = int(episode)
+            ring.coalesced.value += pending - 1
+            pending = 0
+            last = None
+            last_draw = now
+
+            reward_line.set_data(*rewards_history.series())
+            avg_line.set_data(*avg_history.series())
+            epsilon_line.set_data(*epsilon_history.series())
+            title1.set_text(f'Episódio: {episode} | Recompensa: {reward:.1f} | Média: {avg:.1f}')
+            title2.set_text(f'Exploração: {epsilon:.3f}')
+
+            # Eixos só mudam quando os dados saem dos limites (x dobra de tamanho)
+            full_redraw = False
+            if episode > ax1.get_xlim()[1]:
+                ax1.set_xlim(0, episode * 2)
+                ax2.set_xlim(0, episode * 2)
+                full_redraw = True
+            ylim = _expand_limits(*ax1.get_ylim(), reward_line.get_ydata())
+            if ylim is not None:
+                ax1.set_ylim(*ylim)
+                full_redraw = True
+            if full_redraw:
+                canvas.draw()
+            else:
+                canvas.restore_region(background)
+                for artist in animated:
+                    fig.draw_artist(artist)
+            canvas.blit(fig.bbox)
+
+            canvas.flush_events()
+
+        plt.close('all')
     except Exception as e:
         print(f"Erro no processo de métricas: {e}")
-    finally:
-        conn.close()
 
 class MetricsWindow:
-    def __init__(self):
-        self.parent_conn, child_conn = Pipe()
+    def __init__(self, capacity=RING_CAPACITY):
+        self.ring = MetricsRing(capacity)
         self.process = Process(
             target=metrics_process,
-            args=(child_conn,),
+            args=(self.ring,),
             daemon=True
         )
         self.process.start()
-    
+
     def update(self, episode, reward, avg, epsilon):
-        try:
-            self.parent_conn.send((episode, reward, avg, epsilon))
-        except:
-            pass
-    
+        # Escrita no buffer circular: nunca bloqueia o treino
+        self.ring.write(episode, reward, avg, epsilon)
+
+    def stats(self):
+        """Contadores do transporte: registros escritos, descartados e agrupados"""
+        return {
+            'written': self.ring.head.value,
+            'dropped': self.ring.dropped.value,
+            'coalesced': self.ring.coalesced.value,
+            'alive': self.process.is_alive(),
+        }
+
     def close(self):
-        try:
-            self.parent_conn.send('close')
-            self.process.join(timeout=0.5)
-        except:
-            pass
-        finally:
-            if self.process.is_alive():
-                self.process.terminate()
\ No newline at end of file
+        self.ring.closed.value = 1
+        self.process.join(timeout=0.5)
+        if self.process.is_alive():
+            self.process.terminate()
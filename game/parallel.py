@@ -0,0 +1,264 @@
+import os
+import queue
+import random
+import time
+import multiprocessing as mp
+import numpy as np
+from .agent import QLearningAgent, NUM_STATES, NUM_ACTIONS, state_to_index
+from .environment import Environment, MAX_EPISODE_STEPS
+from .stats import RewardStats
+
+MODES = ("shared", "average", "visits")
+
+
+def epsilon_at(hyperparams, episode):
+    """Epsilon do agendamento original (decaimento por episódio) no episódio global dado"""
+    return max(hyperparams['epsilon_min'],
+               hyperparams['epsilon'] * hyperparams['epsilon_decay'] ** episode)
+
+
+def _make_agent(hyperparams, q_values):
+    agent = QLearningAgent(storage="dense")
+    agent.set_q_array(q_values)
+    agent.alpha = hyperparams['alpha']
+    agent.gamma = hyperparams['gamma']
+    agent.epsilon_min = hyperparams['epsilon_min']
+    agent.epsilon_decay = hyperparams['epsilon_decay']
+    return agent
+
+
+def _run_episode(env, agent, visits=None):
+    """Episódio de treino no modo denso; retorna (recompensa total, passos)"""
+    s = state_to_index(env.reset())
+    total_reward = 0
+    done = False
+
+    while not done and env.steps < MAX_EPISODE_STEPS:
+        action = agent.choose_action_index(s)
+        reward, done = env.move_agent(action)
+        ns = state_to_index(env.get_state())
+        agent.learn_index(s, action, reward, ns)
+        if visits is not None:
+            visits[s * NUM_ACTIONS + action] += 1
+        s = ns
+        total_reward += reward
+
+    return total_reward, env.steps
+
+
+def _seed_worker(seed, worker_id):
+    # Cada worker precisa do seu próprio fluxo de labirintos (fork copia o estado do random)
+    random.seed(None if seed is None else seed * 100003 + worker_id)
+
+
+def _shared_worker(worker_id, q_shared, counter, hyperparams, episodes, seed, results):
+    """Hogwild: todos os workers escrevem na mesma Q-table em memória compartilhada"""
+    _seed_worker(seed, worker_id)
+    q_values = np.frombuffer(q_shared, dtype=np.float64).reshape(NUM_STATES, NUM_ACTIONS)
+    agent = _make_agent(hyperparams, q_values)
+    env = Environment(agent)
+    rewards = np.empty(episodes)
+    total_steps = 0
+
+    for i in range(episodes):
+        with counter.get_lock():
+            episode = counter.value
+            counter.value += 1
+        agent.epsilon = epsilon_at(hyperparams, episode)
+        rewards[i], steps = _run_episode(env, agent)
+        total_steps += steps
+
+    results.put((worker_id, rewards, total_steps))
+
+
+def _merge_worker(worker_id, num_workers, conn, hyperparams, seed):
+    """Treina rodadas locais sobre uma cópia da tabela global e devolve tabela e visitas"""
+    _seed_worker(seed, worker_id)
+    q_values = np.zeros((NUM_STATES, NUM_ACTIONS))
+    agent = _make_agent(hyperparams, q_values)
+    env = Environment(agent)
+    visits_array = np.zeros(NUM_STATES * NUM_ACTIONS, dtype=np.int64)
+    visits = memoryview(visits_array)
+
+    while True:
+        message = conn.recv()
+        if message == 'stop':
+            break
+        global_q, first_episode, episodes = message
+        q_values[:] = global_q
+        visits_array.fill(0)
+        rewards = np.empty(episodes)
+        total_steps = 0
+        for i in range(episodes):
+            # Episódios dos workers intercalados no agendamento global de epsilon
+            agent.epsilon = epsilon_at(hyperparams, first_episode + i * num_workers + worker_id)
+            rewards[i], steps = _run_episode(env, agent, visits)
+            total_steps += steps
+        conn.send((q_values, visits_array.reshape(NUM_STATES, NUM_ACTIONS), rewards, total_steps))
+    conn.close()
+
+
+class ParallelTrainer:
+    """
+    Treinamento em K processos. mode="shared" escreve numa única Q-table em memória
+    compartilhada; "average" e "visits" mesclam tabelas locais a cada sync_every
+    episódios por worker (média simples ou ponderada pelo número de visitas).
+    """
+
+    def __init__(self, agent=None, workers=None, mode="shared", sync_every=50, seed=None):
+        if mode not in MODES:
+            raise ValueError(f"Modo desconhecido: {mode} (use {', '.join(MODES)})")
+        self.agent = agent if agent is not None else QLearningAgent(storage="dense")
+        self.workers = workers or os.cpu_count() or 1
+        self.mode = mode
+        self.sync_every = sync_every
+        self.seed = seed
+        self.episodes = 0
+        self.total_steps = 0
+        self.reward_stats = RewardStats()
+        self.episodes_per_sec = 0.0
+
+    def _hyperparams(self):
+        agent = self.agent
+        return {
+            'alpha': agent.alpha,
+            'gamma': agent.gamma,
+            'epsilon': agent.epsilon,
+            'epsilon_min': agent.epsilon_min,
+            'epsilon_decay': agent.epsilon_decay,
+        }
+
+    def train(self, episodes=10000, log_interval=5.0):
+        hyperparams = self._hyperparams()
+        start = time.perf_counter()
+        if self.mode == "shared":
+            episodes = self._train_shared(hyperparams, episodes, log_interval, start)
+        else:
+            episodes = self._train_merged(hyperparams, episodes, log_interval, start)
+        elapsed = time.perf_counter() - start
+
+        # Continua o agendamento de epsilon de onde os workers pararam
+        self.agent.epsilon = epsilon_at(hyperparams, episodes)
+        self.episodes += episodes
+        self.episodes_per_sec = episodes / elapsed if elapsed > 0 else 0.0
+        print(f"Treinamento paralelo concluído: {episodes} episódios em {elapsed:.1f}s "
+              f"({self.workers} workers, {self.episodes_per_sec:.0f} episódios/s)")
+        return elapsed
+
+    def _log(self, done, start):
+        elapsed = time.perf_counter() - start
+        avg = f", {self.reward_stats.format()}" if len(self.reward_stats) else ""
+        print(f"Episódios: {self.episodes + done}{avg}, Episódios/s: {done / elapsed:.0f}")
+
+    def _train_shared(self, hyperparams, episodes, log_interval, start):
+        q_shared = mp.RawArray('d', NUM_STATES * NUM_ACTIONS)
+        np.frombuffer(q_shared, dtype=np.float64)[:] = self.agent.q_array().reshape(-1)
+        counter = mp.Value('q', 0)
+        results = mp.Queue()
+
+        per_worker = [episodes // self.workers + (1 if i < episodes % self.workers else 0)
+                      for i in range(self.workers)]
+        processes = [
+            mp.Process(target=_shared_worker,
+                       args=(i, q_shared, counter, hyperparams, per_worker[i],
+                             self.seed, results),
+                       daemon=True)
+            for i in range(self.workers)
+        ]
+        for process in processes:
+            process.start()
+
+        collected = []
+        while len(collected) < len(processes):
+            try:
+                collected.append(results.get(timeout=log_interval))
+            except queue.Empty:
+                self._log(counter.value, start)
+        for process in processes:
+            process.join()
+
+        for _, rewards, steps in sorted(collected, key=lambda item: item[0]):
+            self.reward_stats.extend(rewards)
+            self.total_steps += steps
+        self.agent.load_q_array(np.frombuffer(q_shared, dtype=np.float64).reshape(NUM_STATES, NUM_ACTIONS))
+        return episodes
+
+    def _train_merged(self, hyperparams, episodes, log_interval, start):
+        pipes = []
+        processes = []
+        for i in range(self.workers):
+            parent_conn, child_conn = mp.Pipe()
+            process = mp.Process(target=_merge_worker,
+                                 args=(i, self.workers, child_conn, hyperparams, self.seed),
+                                 daemon=True)
+            process.start()
+            pipes.append(parent_conn)
+            processes.append(process)
+
+        q_values = self.agent.q_array().copy()
+        done = 0
+        last_log = start
+        try:
+            while done < episodes:
+                # Rodada de até sync_every episódios por worker; o resto é dividido como em
+                # _train_shared, para rodar exatamente `episodes` no total
+                round_episodes = min(self.sync_every * self.workers, episodes - done)
+                per_worker = [round_episodes // self.workers + (1 if i < round_episodes % self.workers else 0)
+                              for i in range(self.workers)]
+                for conn, count in zip(pipes, per_worker):
+                    conn.send((q_values, done, count))
+                replies = [conn.recv() for conn in pipes]
+
+                # Só os workers que treinaram na rodada entram na fusão
+                active = [reply for reply, count in zip(replies, per_worker) if count]
+                tables = np.stack([reply[0] for reply in active])
+                if self.mode == "average":
+                    q_values = tables.mean(axis=0)
+                else:
+                    visits = np.stack([reply[1] for reply in active]).astype(np.float64)
+                    total = visits.sum(axis=0)
+                    weighted = (tables * visits).sum(axis=0)
+                    # Pares (estado, ação) não visitados mantêm o valor global
+                    q_values = np.where(total > 0, weighted / np.maximum(total, 1), q_values)
+
+                for _, _, rewards, steps in replies:
+                    self.reward_stats.extend(rewards)
+                    self.total_steps += steps
+                done += round_episodes
+
+                now = time.perf_counter()
+                if now - last_log >= log_interval:
+                    self._log(done, start)
+                    last_log = now
+        finally:
+            for conn in pipes:
+                conn.send('stop')
+            for process in processes:
+                process.join()
+
+        self.agent.load_q_array(q_values)
+        return done
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Treinamento paralelo em múltiplos processos")
+    parser.add_argument("--episodes", type=int, default=100000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--mode", choices=MODES, default="shared")
+    parser.add_argument("--sync-every", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--no-load", action="store_true", help="Não carrega o modelo salvo")
+    args = parser.parse_args()
+
+    trainer = ParallelTrainer(workers=args.workers, mode=args.mode,
+                              sync_every=args.sync_every, seed=args.seed)
+    if not args.no_load:
+        trainer.agent.load_model()
+    trainer.train(episodes=args.episodes)
+    trainer.agent.save_model()
+
+
+if __name__ == "__main__":
+    main()
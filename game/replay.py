@@ -0,0 +1,127 @@
+import numpy as np
+from .agent import NUM_STATES, NUM_ACTIONS
+
+
+def transitions_to_arrays(indices, actions, rewards, next_indices, dones):
+    """Listas Python de um episódio -> arrays tipados (int16, uint8, float32, int16, bool)"""
+    return (np.asarray(indices, dtype=np.int16), np.asarray(actions, dtype=np.uint8),
+            np.asarray(rewards, dtype=np.float32), np.asarray(next_indices, dtype=np.int16),
+            np.asarray(dones, dtype=bool))
+
+
+class ReplayBuffer:
+    """
+    Experience replay em arrays tipados (anel de capacidade fixa): índices de estado,
+    ações, recompensas, próximos estados e flags de término. replay() reaproveita
+    replay_ratio transições sorteadas por passo real numa única atualização vetorizada.
+    mask_terminal=False segue a regra de learn(), que usa o próximo estado mesmo ao
+    terminar: misturar alvos com e sem término no mesmo estado (dx, dy) desestabiliza.
+    """
+
+    def __init__(self, capacity=50000, replay_ratio=4, seed=None, mask_terminal=False):
+        self.capacity = capacity
+        self.replay_ratio = replay_ratio
+        self.mask_terminal = mask_terminal
+        self.states = np.zeros(capacity, dtype=np.int16)
+        self.actions = np.zeros(capacity, dtype=np.uint8)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros(capacity, dtype=np.int16)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.size = 0
+        self.pos = 0
+        self.updates = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.size
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        """Acrescenta n transições (sobrescreve as mais antigas quando cheio)"""
+        n = len(actions)
+        if n > self.capacity:
+            states, actions, rewards, next_states, dones = (
+                states[-self.capacity:], actions[-self.capacity:], rewards[-self.capacity:],
+                next_states[-self.capacity:], dones[-self.capacity:])
+            n = self.capacity
+        slots = (self.pos + np.arange(n)) % self.capacity
+        self.states[slots] = states
+        self.actions[slots] = actions
+        self.rewards[slots] = rewards
+        self.next_states[slots] = next_states
+        self.dones[slots] = dones
+        self.pos = (self.pos + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def sample(self, batch_size):
+        """Sorteia batch_size transições (com reposição); retorna arrays prontos para o TD"""
+        picks = self.rng.integers(0, self.size, size=batch_size)
+        return (self.states[picks].astype(np.intp), self.actions[picks].astype(np.intp),
+                self.rewards[picks].astype(np.float64), self.next_states[picks].astype(np.intp),
+                self.dones[picks])
+
+    def replay(self, agent, steps):
+        """Atualização TD em minilote para steps passos reais (replay_ratio * steps amostras)"""
+        batch_size = int(self.replay_ratio * steps)
+        if self.size == 0 or batch_size == 0:
+            return 0
+        states, actions, rewards, next_states, dones = self.sample(batch_size)
+        agent.learn_batch_index(states, actions, rewards, next_states,
+                                dones if self.mask_terminal else None, average=True)
+        self.updates += batch_size
+        return batch_size
+
+
+class DynaModel:
+    """
+    Modelo tabular do Dyna-Q: para cada (estado, ação), recompensa média, probabilidade
+    de término e último próximo estado observado (o não terminal, se houver; senão o
+    terminal, do qual learn() também faz o bootstrap). Como o estado (dx, dy)
+    agrega posições diferentes, o modelo guarda médias em vez da última observação.
+    plan() simula planning_steps transições por passo real a partir de pares já vistos
+    e aplica o TD em lote (mask_terminal como em ReplayBuffer).
+    """
+
+    def __init__(self, planning_steps=4, seed=None, mask_terminal=False):
+        self.planning_steps = planning_steps
+        self.mask_terminal = mask_terminal
+        self.counts = np.zeros((NUM_STATES, NUM_ACTIONS))
+        self.reward_sums = np.zeros((NUM_STATES, NUM_ACTIONS))
+        self.done_sums = np.zeros((NUM_STATES, NUM_ACTIONS))
+        self.next_states = np.zeros((NUM_STATES, NUM_ACTIONS), dtype=np.intp)
+        self.live_next = np.zeros((NUM_STATES, NUM_ACTIONS), dtype=bool)  # next_states veio de transição não terminal
+        self._seen_pairs = np.empty(0, dtype=np.intp)
+        self.updates = 0
+        self.rng = np.random.default_rng(seed)
+
+    def observe_batch(self, states, actions, rewards, next_states, dones):
+        states = np.asarray(states, dtype=np.intp)
+        actions = np.asarray(actions, dtype=np.intp)
+        dones = np.asarray(dones, dtype=bool)
+        np.add.at(self.counts, (states, actions), 1)
+        np.add.at(self.reward_sums, (states, actions), rewards)
+        np.add.at(self.done_sums, (states, actions), dones)
+        next_states = np.asarray(next_states, dtype=np.intp)
+        # Atribuição em ordem: em pares repetidos prevalece a última observação. Terminais
+        # só preenchem pares ainda sem próximo estado não terminal (sem isso o par apontaria
+        # para o estado 0 e o planejamento faria bootstrap de Q[0])
+        fill = dones & ~self.live_next[states, actions]
+        self.next_states[states[fill], actions[fill]] = next_states[fill]
+        live = ~dones
+        self.next_states[states[live], actions[live]] = next_states[live]
+        self.live_next[states[live], actions[live]] = True
+        self._seen_pairs = None
+
+    def plan(self, agent, steps):
+        batch_size = int(self.planning_steps * steps)
+        if self._seen_pairs is None:
+            self._seen_pairs = np.flatnonzero(self.counts.reshape(-1))
+        if batch_size == 0 or self._seen_pairs.size == 0:
+            return 0
+        pairs = self._seen_pairs[self.rng.integers(0, self._seen_pairs.size, size=batch_size)]
+        states, actions = np.divmod(pairs, NUM_ACTIONS)
+        counts = self.counts[states, actions]
+        done_prob = self.done_sums[states, actions] / counts if self.mask_terminal else None
+        agent.learn_batch_index(states, actions, self.reward_sums[states, actions] / counts,
+                                self.next_states[states, actions], done_prob, average=True)
+        self.updates += batch_size
+        return batch_size
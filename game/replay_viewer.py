@@ -0,0 +1,173 @@
+import time
+from .game import Game
+from .trajectory import TrajectoryLog, trajectory_roadmap
+from .constants import *
+
+SPEEDS = (1, 2, 5, 10, 20, 50, 100, 200, 500)  # Passos por segundo
+
+
+class ReplayViewer(Game):
+    """
+    Re-simula e desenha episódios gravados por TrajectoryRecorder, sem treinar.
+    Cada episódio é simulado uma vez ao ser aberto (posições e checkpoint atual por
+    passo), então pular para qualquer passo é imediato.
+    """
+
+    def __init__(self, log, speed=10):
+        super().__init__(metrics=False)
+        self.log = log
+        self.speed_index = min(range(len(SPEEDS)), key=lambda i: abs(SPEEDS[i] - speed))
+        self.paused = False
+        self.index = None
+        self.trajectory = None
+        self.frames = []
+        self.cursor = 0.0  # Passo atual (fracionário entre quadros)
+
+    @property
+    def speed(self):
+        return SPEEDS[self.speed_index]
+
+    def open_record(self, index):
+        """Carrega o registro index do log e re-simula o episódio"""
+        self.index = min(max(index, 0), len(self.log) - 1)
+        self.trajectory = self.log[self.index]
+        roadmap = trajectory_roadmap(self.trajectory)
+        resized = (roadmap.rows, roadmap.cols) != (self.rows, self.cols)
+        self.rows, self.cols = roadmap.rows, roadmap.cols
+        self.roadmap = roadmap
+        self.agent_pos = roadmap.start_pos
+        self.steps = 0
+        self.completed = False
+        self.episodes = self.trajectory.episode
+
+        # Re-simulação com as regras do ambiente (move_agent) a partir do início gravado
+        self.frames = [(self.agent_pos, 0, 0.0)]
+        total_reward = 0
+        for action in self.trajectory.actions.tolist():
+            reward, done = self.move_agent(action)
+            total_reward += reward
+            self.frames.append((self.agent_pos, roadmap.current_checkpoint, total_reward))
+            if done:
+                break
+        if abs(total_reward - self.trajectory.total_reward) > 1e-6:
+            print(f"Aviso: episódio {self.episodes} re-simulado com recompensa {total_reward:.1f} "
+                  f"(gravada: {self.trajectory.total_reward:.1f})")
+
+        self.cursor = 0.0
+        if resized:
+            self.update_view()
+            if self.screen is not None:
+                self.open_display()
+        self.seek(0)
+
+    def seek(self, step):
+        """Posiciona a reprodução no passo step (0 = posição inicial)"""
+        step = min(max(int(step), 0), len(self.frames) - 1)
+        self.cursor = float(step)
+        self.agent_pos, self.roadmap.current_checkpoint, _ = self.frames[step]
+
+    @property
+    def step(self):
+        return int(self.cursor)
+
+    def hud_lines(self):
+        _, _, total_reward = self.frames[self.step]
+        return [
+            f"Episódio: {self.episodes} ({self.index + 1}/{len(self.log)})",
+            f"Passo: {self.step}/{len(self.frames) - 1}  Recompensa: {total_reward:.1f}",
+            f"Velocidade: {self.speed} passos/s" + (" (pausado)" if self.paused else ""),
+        ]
+
+    def handle_key(self, key):
+        import pygame
+        last = len(self.frames) - 1
+        if key == pygame.K_ESCAPE:
+            self.running = False
+        elif key == pygame.K_SPACE:
+            self.paused = not self.paused
+        elif key in (pygame.K_UP, pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+            self.speed_index = min(self.speed_index + 1, len(SPEEDS) - 1)
+        elif key in (pygame.K_DOWN, pygame.K_MINUS, pygame.K_KP_MINUS):
+            self.speed_index = max(self.speed_index - 1, 0)
+        elif key == pygame.K_RIGHT:
+            self.paused = True
+            self.seek(self.step + 1)
+        elif key == pygame.K_LEFT:
+            self.paused = True
+            self.seek(self.step - 1)
+        elif key == pygame.K_HOME:
+            self.seek(0)
+        elif key == pygame.K_END:
+            self.seek(last)
+        elif pygame.K_0 <= key <= pygame.K_9:
+            self.seek(last * (key - pygame.K_0) / 10)  # 0-9: pula para 0%..90% do episódio
+        elif key in (pygame.K_n, pygame.K_PAGEDOWN):
+            self.open_record(self.index + 1)
+        elif key in (pygame.K_b, pygame.K_PAGEUP):
+            self.open_record(self.index - 1)
+
+    def run(self, index=0, autoplay=True):
+        """Laço da janela; com autoplay, ao fim de um episódio passa ao próximo"""
+        self.open_record(index)
+        self.render()
+        last_time = time.perf_counter()
+        while self.running:
+            self.pump_events()
+            keys, self.key_events = self.key_events, []
+            for key in keys:
+                self.handle_key(key)
+
+            now = time.perf_counter()
+            if not self.paused:
+                self.cursor += (now - last_time) * self.speed
+                if self.cursor >= len(self.frames) - 1:
+                    if autoplay and self.index < len(self.log) - 1:
+                        self.open_record(self.index + 1)
+                    else:
+                        self.seek(len(self.frames) - 1)
+                        self.paused = True
+                else:
+                    cursor = self.cursor
+                    self.seek(cursor)
+                    self.cursor = cursor
+            last_time = now
+
+            if self.running:
+                self.render()
+            time.sleep(max(self.frame_interval - (time.perf_counter() - now), 0))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay de episódios gravados durante o treino")
+    parser.add_argument("path", nargs="?", default=TRAJECTORY_PATH, help="Log de trajetórias")
+    parser.add_argument("--episode", type=int, default=None, help="Começa no episódio gravado N")
+    parser.add_argument("--speed", type=int, default=10, help="Passos por segundo")
+    parser.add_argument("--no-autoplay", action="store_true", help="Para ao fim de cada episódio")
+    parser.add_argument("--list", action="store_true", help="Lista os episódios gravados e sai")
+    args = parser.parse_args()
+
+    log = TrajectoryLog(args.path)
+    if len(log) == 0:
+        print(f"Nenhum episódio gravado em {args.path}")
+        return
+    if args.list:
+        for i in range(len(log)):
+            trajectory = log[i]
+            print(f"Episódio {trajectory.episode}: {len(trajectory.actions)} ações, "
+                  f"recompensa {trajectory.total_reward:.1f}, mapa {trajectory.grid.shape[0]}x{trajectory.grid.shape[1]}")
+        return
+
+    print("Espaço: pausa | ←/→: passo a passo | ↑/↓: velocidade | 0-9, Home/End: pular | "
+          "N/B: próximo/anterior | ESC: sair")
+    viewer = ReplayViewer(log, speed=args.speed)
+    try:
+        viewer.run(log.find(args.episode) if args.episode is not None else 0,
+                   autoplay=not args.no_autoplay)
+    finally:
+        viewer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,193 +1,388 @@
 import random
+from collections import namedtuple, OrderedDict
 import numpy as np
-from collections import defaultdict
 from .constants import *
 
+# Forma compacta de um labirinto pronto (grid uint8, checkpoints e posição inicial)
+MazeSpec = namedtuple("MazeSpec", ["grid", "checkpoints", "start_pos"])
+
+# Mapas maiores que a janela: fundo desenhado em blocos sob demanda (ver draw_view)
+CHUNK_CELLS = 32
+MAX_CACHED_CHUNKS = 64
+MINIMAP_SIZE = 150  # Lado máximo do minimapa, em pixels
+
+
+def _grow(frontier):
+    """Vizinhos (4-conectados) das células marcadas em frontier"""
+    grown = np.zeros_like(frontier)
+    grown[1:] |= frontier[:-1]
+    grown[:-1] |= frontier[1:]
+    grown[:, 1:] |= frontier[:, :-1]
+    grown[:, :-1] |= frontier[:, 1:]
+    return grown
+
+
+def flood_fill(road, seeds):
+    """Células de estrada alcançáveis a partir de seeds (máscaras booleanas), por fronteiras vetorizadas"""
+    reached = seeds & road
+    frontier = reached
+    while frontier.any():
+        frontier = _grow(frontier) & road & ~reached
+        reached |= frontier
+    return reached
+
+
+def distance_field(road, target):
+    """Distância em passos (BFS por fronteiras) de cada célula de estrada até target; -1 onde não alcança"""
+    distances = np.full(road.shape, -1, dtype=np.int32)
+    row, col = target
+    if not road[row, col]:
+        return distances
+    if road.all():
+        # Sem paredes o caminho mais curto é a distância de Manhattan
+        rows = np.abs(np.arange(road.shape[0], dtype=np.int32) - row)
+        cols = np.abs(np.arange(road.shape[1], dtype=np.int32) - col)
+        return rows[:, None] + cols[None, :]
+    reached = np.zeros_like(road)
+    reached[row, col] = True
+    distances[row, col] = 0
+    frontier = reached
+    distance = 0
+    while frontier.any():
+        distance += 1
+        frontier = _grow(frontier) & road & ~reached
+        reached |= frontier
+        distances[frontier] = distance
+    return distances
 
 
 class RoadMap:
-    def __init__(self):
-        self.grid = np.zeros((ROWS, COLS), dtype=int)
-        self.generate_maze()
-        self.checkpoints = self.generate_checkpoints(3)
+    def __init__(self, seed=None, rows=ROWS, cols=COLS):
+        # Com seed usa um gerador próprio; sem seed usa o módulo random (respeita random.seed)
+        rng = random.Random(seed) if seed is not None else random
+        self.seed = seed
+        # Tamanho em tempo de execução; uint8 mantém mapas de milhões de células leves
+        self.rows, self.cols = rows, cols
+        self.grid = np.zeros((rows, cols), dtype=np.uint8)
+        self.generate_maze(rng)
+        self.checkpoints = self.generate_checkpoints(3, rng)
         self.current_checkpoint = 0
-        self.start_pos = self.find_random_road_position()
-        self.validate_checkpoints()
-    
-    def validate_checkpoints(self):
+        self.start_pos = self.find_random_road_position(rng)
+        self.validate_checkpoints(rng)
+
+    @classmethod
+    def from_spec(cls, spec):
+        """Cria um RoadMap a partir de um MazeSpec, sem gerar um novo labirinto"""
+        roadmap = cls.__new__(cls)
+        roadmap.seed = None
+        roadmap.grid = np.asarray(spec.grid, dtype=np.uint8)
+        roadmap.rows, roadmap.cols = roadmap.grid.shape
+        roadmap.checkpoints = [tuple(int(v) for v in cp) for cp in spec.checkpoints]
+        roadmap.current_checkpoint = 0
+        roadmap.start_pos = (int(spec.start_pos[0]), int(spec.start_pos[1]))
+        roadmap.index_roads()
+        return roadmap
+
+    def to_spec(self):
+        return MazeSpec(self.grid.astype(np.uint8), list(self.checkpoints), self.start_pos)
+
+    def __setstate__(self, state):
+        # Saves antigos (pickle) não têm o índice de estradas nem o tamanho
+        self.__dict__.update(state)
+        if 'rows' not in state:
+            self.rows, self.cols = self.grid.shape
+        if 'road_cells' not in state:
+            self.index_roads()
+
+    def index_roads(self):
+        """Índice (plano) das células de estrada, calculado uma vez por labirinto"""
+        self.road_cells = np.flatnonzero(self.grid.ravel() == 1)
+
+    def road_position(self, i):
+        row, col = divmod(int(self.road_cells[i]), self.cols)
+        return (row, col)
+
+    def validate_checkpoints(self, rng=random):
         """Garante que temos checkpoints válidos"""
         if len(self.checkpoints) == 0:
             # Se não houver checkpoints, cria pelo menos um
-            road_positions = [(r, c) for r in range(ROWS) for c in range(COLS) if self.grid[r][c] == 1]
-            if road_positions:
-                self.checkpoints.append(random.choice(road_positions))
+            if len(self.road_cells):
+                self.checkpoints.append(self.road_position(rng.randrange(len(self.road_cells))))
             else:
                 # Se não houver estradas, cria um checkpoint no meio
-                self.grid[ROWS//2][COLS//2] = 1
-                self.checkpoints.append((ROWS//2, COLS//2))
-    
-    def generate_maze(self):
-        # Geração do labirinto usando Depth-First Search
-        stack = [(random.randint(0, ROWS-1), random.randint(0, COLS-1))]
-        visited = set()
-        
-        while stack:
-            row, col = stack.pop()
-            self.grid[row][col] = 1
-            visited.add((row, col))
-            
-            neighbors = []
-            for dr, dc in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                r, c = row + dr, col + dc
-                if 0 <= r < ROWS and 0 <= c < COLS and (r, c) not in visited:
-                    neighbors.append((r, c))
-            
-            random.shuffle(neighbors)
-            stack.extend(neighbors)
-        
+                self.grid[self.rows//2][self.cols//2] = 1
+                self.index_roads()
+                self.checkpoints.append((self.rows//2, self.cols//2))
+
+    def generate_maze(self, rng=random):
+        # A DFS original (pilha + visitados) marcava como estrada toda célula alcançável a
+        # partir da célula inicial; como não há obstáculos, o resultado é sempre o grid
+        # inteiro. Preencher o array direto dá o mesmo labirinto sem o laço em Python.
+        self.grid.fill(1)
+
         # Conectar áreas desconectadas
-        self.connect_isolated_areas()
-    
-    def connect_isolated_areas(self):
+        self.connect_isolated_areas(rng)
+
+    def connect_isolated_areas(self, rng=random):
         # Identificar áreas isoladas e conectá-las
-        visited = np.zeros((ROWS, COLS), dtype=bool)
+        road = self.grid == 1
+        self.index_roads()
+        if len(self.road_cells) == road.size:
+            return  # Grid todo de estrada: uma única região
+
         regions = []
-        
-        for row in range(ROWS):
-            for col in range(COLS):
-                if self.grid[row][col] == 1 and not visited[row][col]:
-                    region = []
-                    stack = [(row, col)]
-                    visited[row][col] = True
-                    
-                    while stack:
-                        r, c = stack.pop()
-                        region.append((r, c))
-                        
-                        for dr, dc in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                            nr, nc = r + dr, c + dc
-                            if (0 <= nr < ROWS and 0 <= nc < COLS and 
-                                self.grid[nr][nc] == 1 and not visited[nr][nc]):
-                                visited[nr][nc] = True
-                                stack.append((nr, nc))
-                    
-                    regions.append(region)
-        
+        remaining = road.copy()
+
+        while remaining.any():
+            seed = np.zeros_like(road)
+            seed.flat[np.argmax(remaining)] = True
+            region = flood_fill(road, seed)
+            regions.append(np.flatnonzero(region.ravel()))
+            remaining &= ~region
+
         # Conectar regiões se houver mais de uma
         if len(regions) > 1:
             for i in range(len(regions)-1):
-                r1, c1 = random.choice(regions[i])
-                r2, c2 = random.choice(regions[i+1])
-                
-                # Criar caminho entre as regiões
-                while r1 != r2 or c1 != c2:
-                    if r1 < r2:
-                        r1 += 1
-                    elif r1 > r2:
-                        r1 -= 1
-                    elif c1 < c2:
-                        c1 += 1
-                    elif c1 > c2:
-                        c1 -= 1
-                    
-                    self.grid[r1][c1] = 1
-    
-    def generate_checkpoints(self, num):
-        checkpoints = []
-        road_positions = [(r, c) for r in range(ROWS) for c in range(COLS) if self.grid[r][c] == 1]
-        
+                r1, c1 = divmod(int(regions[i][rng.randrange(len(regions[i]))]), self.cols)
+                r2, c2 = divmod(int(regions[i+1][rng.randrange(len(regions[i+1]))]), self.cols)
+
+                # Criar caminho entre as regiões (primeiro nas linhas, depois nas colunas)
+                self.grid[min(r1, r2):max(r1, r2)+1, c1] = 1
+                self.grid[r2, min(c1, c2):max(c1, c2)+1] = 1
+            self.index_roads()
+
+    def generate_checkpoints(self, num, rng=random):
         # Garante que não tentaremos mais checkpoints que estradas disponíveis
-        num = min(num, len(road_positions))
-        
-        for _ in range(num):
-            if road_positions:
-                pos = random.choice(road_positions)
-                checkpoints.append(pos)
-                road_positions.remove(pos)
-        
-        return checkpoints
-    
-    def find_random_road_position(self):
-        road_positions = [(r, c) for r in range(ROWS) for c in range(COLS) if self.grid[r][c] == 1]
-        return random.choice(road_positions) if road_positions else (ROWS//2, COLS//2)
-    
+        num = min(num, len(self.road_cells))
+
+        # Amostragem sem reposição direto no índice de estradas
+        return [self.road_position(i) for i in rng.sample(range(len(self.road_cells)), num)]
+
+    def find_random_road_position(self, rng=random):
+        if len(self.road_cells) == 0:
+            return (self.rows//2, self.cols//2)
+        return self.road_position(rng.randrange(len(self.road_cells)))
+
+    def distance_fields(self):
+        """
+        Campos de distância (BFS) até cada checkpoint, array (K, rows, cols) com -1 onde
+        não há caminho. Calculados uma vez por labirinto, na primeira consulta.
+        """
+        fields = getattr(self, '_distances', None)
+        if fields is None:
+            road = self.grid == 1
+            fields = np.empty((len(self.checkpoints),) + road.shape, dtype=np.int32)
+            for k, checkpoint in enumerate(self.checkpoints):
+                fields[k] = distance_field(road, checkpoint)
+            # remaining[k]: passos mínimos do checkpoint k-1 até o último (sufixo dos trechos)
+            legs = [int(fields[k][self.checkpoints[k - 1]]) for k in range(1, len(self.checkpoints))]
+            remaining = [0] * (len(self.checkpoints) + 1)
+            for k in range(len(legs) - 1, -1, -1):
+                remaining[k + 1] = -1 if legs[k] < 0 or remaining[k + 2] < 0 else legs[k] + remaining[k + 2]
+            self._remaining = remaining
+            self._distances = fields
+        return fields
+
+    def remaining_distance(self, pos, checkpoint=None):
+        """Passos mínimos de pos até completar os checkpoints a partir de checkpoint (padrão: o atual); -1 se impossível"""
+        fields = self.distance_fields()
+        if checkpoint is None:
+            checkpoint = self.current_checkpoint
+        if checkpoint >= len(self.checkpoints):
+            return 0
+        distance = int(fields[checkpoint, pos[0], pos[1]])
+        tail = self._remaining[checkpoint + 1]
+        return -1 if distance < 0 or tail < 0 else distance + tail
+
+    def optimal_steps(self):
+        """Passos mínimos para completar o labirinto a partir da posição inicial"""
+        return self.remaining_distance(self.start_pos, 0)
+
     def is_road(self, row, col):
-        return 0 <= row < ROWS and 0 <= col < COLS and self.grid[row][col] == 1
+        # item() devolve int do Python: comparar escalares uint8 do NumPy é bem mais lento
+        return 0 <= row < self.rows and 0 <= col < self.cols and self.grid.item(row, col) == 1
     
-    def draw(self, screen):
+    def __getstate__(self):
+        # Superfícies do pygame em cache não são serializáveis
+        state = self.__dict__.copy()
+        for key in ('_background', '_chunks', '_minimap'):
+            state.pop(key, None)
+        return state
+
+    def get_background(self):
+        """Fundo estático (estradas e paredes), desenhado uma vez por labirinto"""
+        background = getattr(self, '_background', None)
+        if background is None:
+            background = self._background = self._draw_region(0, self.rows, 0, self.cols)
+        return background
+
+    def _draw_region(self, row0, row1, col0, col1):
+        """Fundo das células [row0:row1, col0:col1] em uma superfície própria"""
         import pygame
+        surface = pygame.Surface(((col1 - col0) * CELL_SIZE, (row1 - row0) * CELL_SIZE))
         # Desenhar fundo
-        screen.fill(BLACK)
-        
-        # Textura para as paredes (opcional)
-        wall_texture = pygame.Surface((CELL_SIZE, CELL_SIZE))
-        wall_texture.fill((50, 50, 50))  # Cor base
-        # Adiciona padrão de tijolos
-        for i in range(0, CELL_SIZE, 2):
-            pygame.draw.line(wall_texture, (70, 70, 70), (0, i), (CELL_SIZE, i), 1)
-        
-        # Desenhar caminhos (estradas)
-        road_surface = pygame.Surface((CELL_SIZE-2, CELL_SIZE-2))  # Um pouco menor que a célula
-        road_surface.fill((100, 100, 100))  # Cor cinza para a estrada
-        # Adiciona marcações de estrada
-        pygame.draw.line(road_surface, (150, 150, 150), 
-                    (CELL_SIZE//4, CELL_SIZE//2), 
-                    (3*CELL_SIZE//4, CELL_SIZE//2), 2)
-        
-        # Desenhar o grid
-        for row in range(ROWS):
-            for col in range(COLS):
-                if self.grid[row][col] == 1:  # Caminho
-                    screen.blit(road_surface, (col * CELL_SIZE + 1, row * CELL_SIZE + 1))
-                else:  # Parede
-                    screen.blit(wall_texture, (col * CELL_SIZE, row * CELL_SIZE))
-        
-        # Desenhar checkpoints com efeitos visuais
-        checkpoint_colors = [
-            (0, 255, 0),   # Verde - próximo checkpoint
-            (0, 200, 200),  # Ciano
-            (200, 0, 200),  # Magenta
-            (255, 255, 0),  # Amarelo
-        ]
-        
+        surface.fill(BLACK)
+
+        wall_texture, road_surface = _cell_textures()
+        region = self.grid[row0:row1, col0:col1]
+
+        # Desenhar o grid (um único blits por tipo de célula)
+        rows, cols = np.nonzero(region == 1)  # Caminho
+        surface.blits([(road_surface, (col * CELL_SIZE + 1, row * CELL_SIZE + 1))
+                       for row, col in zip(rows.tolist(), cols.tolist())], doreturn=False)
+        rows, cols = np.nonzero(region == 0)  # Parede
+        surface.blits([(wall_texture, (col * CELL_SIZE, row * CELL_SIZE))
+                       for row, col in zip(rows.tolist(), cols.tolist())], doreturn=False)
+
+        # Adicionar bordas arredondadas nas paredes (paredes com menos de 4 vizinhos parede);
+        # a margem de 1 célula vem do grid vizinho, fora do mapa conta como não-parede
+        wall = np.zeros((row1 - row0 + 2, col1 - col0 + 2), dtype=bool)
+        r0, r1 = max(row0 - 1, 0), min(row1 + 1, self.rows)
+        c0, c1 = max(col0 - 1, 0), min(col1 + 1, self.cols)
+        wall[r0 - row0 + 1:r1 - row0 + 1, c0 - col0 + 1:c1 - col0 + 1] = self.grid[r0:r1, c0:c1] == 0
+        neighbors = (wall[:-2, 1:-1].astype(int) + wall[2:, 1:-1] + wall[1:-1, :-2] + wall[1:-1, 2:])
+        for row, col in zip(*np.nonzero((region == 0) & (neighbors < 4))):
+            pygame.draw.rect(surface, (70, 70, 70),
+                             (col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE),
+                             border_radius=3)
+        return surface
+
+    def fits(self, view_rows, view_cols):
+        return self.rows <= view_rows and self.cols <= view_cols
+
+    def draw_view(self, surface, top, left, view_rows, view_cols):
+        """
+        Desenha só o trecho visível do fundo (câmera em top/left, em células), a partir
+        de blocos de CHUNK_CELLS células desenhados sob demanda e mantidos em cache (LRU).
+        """
+        chunks = getattr(self, '_chunks', None)
+        if chunks is None:
+            chunks = self._chunks = OrderedDict()
+        bottom = min(top + view_rows, self.rows)
+        right = min(left + view_cols, self.cols)
+        for chunk_row in range(top // CHUNK_CELLS, (bottom - 1) // CHUNK_CELLS + 1):
+            for chunk_col in range(left // CHUNK_CELLS, (right - 1) // CHUNK_CELLS + 1):
+                key = (chunk_row, chunk_col)
+                chunk = chunks.get(key)
+                if chunk is None:
+                    row0, col0 = chunk_row * CHUNK_CELLS, chunk_col * CHUNK_CELLS
+                    chunk = chunks[key] = self._draw_region(
+                        row0, min(row0 + CHUNK_CELLS, self.rows), col0, min(col0 + CHUNK_CELLS, self.cols))
+                    if len(chunks) > MAX_CACHED_CHUNKS:
+                        chunks.popitem(last=False)
+                else:
+                    chunks.move_to_end(key)
+                surface.blit(chunk, ((chunk_col * CHUNK_CELLS - left) * CELL_SIZE,
+                                     (chunk_row * CHUNK_CELLS - top) * CELL_SIZE))
+
+    def get_minimap(self, max_size=MINIMAP_SIZE):
+        """Minimapa (estrada/parede reduzido por blocos), calculado uma vez por labirinto"""
+        minimap = getattr(self, '_minimap', None)
+        if minimap is None:
+            import pygame
+            scale = -(-max(self.rows, self.cols) // max_size)  # Células por pixel (teto)
+            rows, cols = -(-self.rows // scale), -(-self.cols // scale)
+            padded = np.zeros((rows * scale, cols * scale), dtype=np.uint8)
+            padded[:self.rows, :self.cols] = self.grid
+            road = padded.reshape(rows, scale, cols, scale).max(axis=(1, 3)).astype(bool)
+            pixels = np.where(road[..., None], np.uint8(100), np.uint8(50)).repeat(3, axis=2)
+            minimap = self._minimap = (pygame.surfarray.make_surface(pixels.transpose(1, 0, 2)), scale)
+        return minimap
+
+    def checkpoint_rect(self, i, top=0, left=0):
+        row, col = self.checkpoints[i]
+        return ((col - left) * CELL_SIZE, (row - top) * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+
+    def draw_checkpoints(self, screen, top=0, left=0):
+        """
+        Desenha os checkpoints (parte dinâmica) e retorna os retângulos alterados.
+        top/left: câmera em células; checkpoints fora da tela são ignorados.
+        """
+        import pygame
+        rects = []
+        view_rows = screen.get_height() // CELL_SIZE
+        view_cols = screen.get_width() // CELL_SIZE
         for i, (row, col) in enumerate(self.checkpoints):
-            if i < len(checkpoint_colors):
-                color = checkpoint_colors[i]
+            if i < len(CHECKPOINT_COLORS):
+                if not (top <= row < top + view_rows and left <= col < left + view_cols):
+                    continue
+                row, col = row - top, col - left
+                color = CHECKPOINT_COLORS[i]
                 if i == self.current_checkpoint:
                     # Efeito pulsante para o checkpoint atual
                     size = CELL_SIZE + int(2 * abs(pygame.time.get_ticks() % 1000 - 500) / 500)
-                    pygame.draw.circle(screen, color, 
-                                    (col * CELL_SIZE + CELL_SIZE//2, 
-                                    row * CELL_SIZE + CELL_SIZE//2), 
+                    pygame.draw.circle(screen, color,
+                                    (col * CELL_SIZE + CELL_SIZE//2,
+                                    row * CELL_SIZE + CELL_SIZE//2),
                                     size//2 - 2)
                 else:
                     # Checkpoints completos
-                    pygame.draw.rect(screen, color, 
-                                (col * CELL_SIZE + 2, row * CELL_SIZE + 2, 
-                                    CELL_SIZE - 4, CELL_SIZE - 4), 
+                    pygame.draw.rect(screen, color,
+                                (col * CELL_SIZE + 2, row * CELL_SIZE + 2,
+                                    CELL_SIZE - 4, CELL_SIZE - 4),
                                     border_radius=5)
-                
+
                 # Número do checkpoint
-                font = pygame.font.SysFont('Arial', 16, bold=True)
-                text = font.render(str(i+1), True, BLACK)
-                text_rect = text.get_rect(center=(col * CELL_SIZE + CELL_SIZE//2, 
+                text = _checkpoint_glyph(i + 1)
+                text_rect = text.get_rect(center=(col * CELL_SIZE + CELL_SIZE//2,
                                                 row * CELL_SIZE + CELL_SIZE//2))
                 screen.blit(text, text_rect)
-        
-        # Adicionar bordas arredondadas nas paredes
-        for row in range(ROWS):
-            for col in range(COLS):
-                if self.grid[row][col] == 0:  # Parede
-                    # Verifica vizinhos para suavizar cantos
-                    neighbors = 0
-                    for dr, dc in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                        r, c = row + dr, col + dc
-                        if 0 <= r < ROWS and 0 <= c < COLS and self.grid[r][c] == 0:
-                            neighbors += 1
-                    
-                    # Desenha cantos arredondados para paredes isoladas
-                    if neighbors < 4:
-                        pygame.draw.rect(screen, (70, 70, 70), 
-                                    (col * CELL_SIZE, row * CELL_SIZE, 
-                                        CELL_SIZE, CELL_SIZE), 
-                                        border_radius=3)
\ No newline at end of file
+                rects.append(self.checkpoint_rect(i, top, left))
+        return rects
+
+    def draw(self, screen, top=0, left=0):
+        if self.fits(screen.get_height() // CELL_SIZE, screen.get_width() // CELL_SIZE):
+            screen.blit(self.get_background(), (0, 0))
+        else:
+            self.draw_view(screen, top, left, screen.get_height() // CELL_SIZE, screen.get_width() // CELL_SIZE)
+        self.draw_checkpoints(screen, top, left)
+
+
+CHECKPOINT_COLORS = [
+    (0, 255, 0),   # Verde - próximo checkpoint
+    (0, 200, 200),  # Ciano
+    (200, 0, 200),  # Magenta
+    (255, 255, 0),  # Amarelo
+]
+
+# Caches de recursos do pygame (criados uma vez por processo)
+_font_cache = {}
+_glyph_cache = {}
+_texture_cache = []
+
+
+def get_font(name, size, bold=False):
+    import pygame
+    key = (name, size, bold)
+    font = _font_cache.get(key)
+    if font is None:
+        font = _font_cache[key] = pygame.font.SysFont(name, size, bold=bold)
+    return font
+
+
+def _checkpoint_glyph(number):
+    glyph = _glyph_cache.get(number)
+    if glyph is None:
+        glyph = _glyph_cache[number] = get_font('Arial', 16, bold=True).render(str(number), True, BLACK)
+    return glyph
+
+
+def _cell_textures():
+    if not _texture_cache:
+        import pygame
+        # Textura para as paredes (opcional)
+        wall_texture = pygame.Surface((CELL_SIZE, CELL_SIZE))
+        wall_texture.fill((50, 50, 50))  # Cor base
+        # Adiciona padrão de tijolos
+        for i in range(0, CELL_SIZE, 2):
+            pygame.draw.line(wall_texture, (70, 70, 70), (0, i), (CELL_SIZE, i), 1)
+
+        # Desenhar caminhos (estradas)
+        road_surface = pygame.Surface((CELL_SIZE-2, CELL_SIZE-2))  # Um pouco menor que a célula
+        road_surface.fill((100, 100, 100))  # Cor cinza para a estrada
+        # Adiciona marcações de estrada
+        pygame.draw.line(road_surface, (150, 150, 150),
+                    (CELL_SIZE//4, CELL_SIZE//2),
+                    (3*CELL_SIZE//4, CELL_SIZE//2), 2)
+        _texture_cache.extend([wall_texture, road_surface])
+    return _texture_cache
@@ -0,0 +1,409 @@
+import math
+import os
+import tempfile
+import threading
+import numpy as np
+
+HISTORY_CHUNK = 4096  # Registros mantidos em RAM antes de irem para o disco
+
+
+def new_generation():
+    """Identificador aleatório de uma geração de histórico (ver RewardStats.generation)"""
+    return os.urandom(4).hex()
+
+
+class RingBuffer:
+    """Anel float64 de capacidade fixa sobre um array NumPy (acesso escalar por memoryview)"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.data = np.zeros(capacity)
+        self._view = memoryview(self.data)
+        self.count = 0
+        self.pos = 0  # Próxima posição a escrever
+
+    def __len__(self):
+        return self.count
+
+    def append(self, value):
+        """Acrescenta value; retorna o valor descartado (ou None se o anel não estava cheio)"""
+        pos = self.pos
+        old = self._view[pos] if self.count == self.capacity else None
+        self._view[pos] = value
+        self.pos = pos + 1 if pos + 1 < self.capacity else 0
+        if old is None:
+            self.count += 1
+        return old
+
+    def last(self):
+        return self._view[self.pos - 1] if self.count else None
+
+    def values(self):
+        """Cópia em ordem cronológica"""
+        if self.count < self.capacity:
+            return self.data[:self.count].copy()
+        return np.concatenate((self.data[self.pos:], self.data[:self.pos]))
+
+    def clear(self):
+        self.count = 0
+        self.pos = 0
+
+
+class RollingStats:
+    """
+    Média e variância das últimas window amostras em O(1) por amostra (somas móveis).
+    A cada volta completa do anel as somas são recalculadas do zero, então o erro de
+    arredondamento não se acumula em execuções longas.
+    """
+
+    def __init__(self, window=100):
+        self.window = window
+        self.ring = RingBuffer(window)
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def __len__(self):
+        return len(self.ring)
+
+    def add(self, value):
+        value = float(value)
+        old = self.ring.append(value)
+        if old is not None:
+            self.total -= old
+            self.total_sq -= old * old
+        self.total += value
+        self.total_sq += value * value
+        if self.ring.pos == 0:
+            values = self.ring.data
+            self.total = math.fsum(values)
+            self.total_sq = float(np.dot(values, values))
+        return self.mean
+
+    @property
+    def mean(self):
+        count = len(self.ring)
+        return self.total / count if count else 0.0
+
+    @property
+    def var(self):
+        """Variância populacional da janela"""
+        count = len(self.ring)
+        if count == 0:
+            return 0.0
+        mean = self.total / count
+        return max(self.total_sq / count - mean * mean, 0.0)
+
+    @property
+    def std(self):
+        return math.sqrt(self.var)
+
+    def clear(self):
+        self.ring.clear()
+        self.total = self.total_sq = 0.0
+
+
+class EWMA:
+    """Média móvel exponencial: value += alpha * (x - value); a primeira amostra inicia o valor"""
+
+    def __init__(self, alpha=0.01):
+        self.alpha = alpha
+        self.value = None
+
+    def add(self, value):
+        if self.value is None:
+            self.value = float(value)
+        else:
+            self.value += self.alpha * (value - self.value)
+        return self.value
+
+    def clear(self):
+        self.value = None
+
+
+class P2Quantile:
+    """
+    Quantil p estimado pelo algoritmo P² (Jain & Chlamtac, 1985): 5 marcadores cujas
+    alturas são ajustadas por interpolação parabólica, memória O(1) sem guardar as amostras.
+    """
+
+    def __init__(self, p):
+        if not 0.0 < p < 1.0:
+            raise ValueError(f"Quantil fora de (0, 1): {p}")
+        self.p = p
+        self.count = 0
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        # Posição desejada do marcador i após n amostras: 1 + (n - 1) * increments[i]
+        self.increments = (0.0, p / 2, p, (1 + p) / 2, 1.0)
+
+    @classmethod
+    def from_array(cls, values, p):
+        """Estimador já posicionado sobre values (marcadores nas estatísticas de ordem exatas)"""
+        estimator = cls(p)
+        values = np.asarray(values, dtype=np.float64)
+        n = len(values)
+        if n < 5:
+            for value in values:
+                estimator.add(value)
+            return estimator
+        positions = [int(round(1 + (n - 1) * increment)) for increment in estimator.increments]
+        # Posições estritamente crescentes, com as pontas fixas em 1 e n
+        positions[0], positions[4] = 1, n
+        for i in range(1, 4):
+            positions[i] = max(positions[i], positions[i - 1] + 1)
+        for i in range(3, 0, -1):
+            positions[i] = min(positions[i], positions[i + 1] - 1)
+        ranks = [position - 1 for position in positions]
+        estimator.heights = np.partition(values, ranks)[ranks].tolist()
+        estimator.positions = positions
+        estimator.count = n
+        return estimator
+
+    def add(self, value):
+        value = float(value)
+        self.count += 1
+        heights = self.heights
+        if self.count <= 5:
+            heights.append(value)
+            heights.sort()
+            return
+
+        positions = self.positions
+        if value < heights[0]:
+            heights[0] = value
+            k = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            k = 3
+        else:
+            k = 0
+            while value >= heights[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            positions[i] += 1
+
+        # Ajusta os marcadores internos que se afastaram da posição desejada
+        n = self.count - 1
+        increments = self.increments
+        for i in range(1, 4):
+            d = 1 + n * increments[i] - positions[i]
+            if (d >= 1 and positions[i + 1] - positions[i] > 1) or \
+                    (d <= -1 and positions[i - 1] - positions[i] < -1):
+                d = 1 if d > 0 else -1
+                height = self._parabolic(i, d)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + d * (heights[i + d] - heights[i]) / (positions[i + d] - positions[i])
+                heights[i] = height
+                positions[i] += d
+
+    def _parabolic(self, i, d):
+        q, n = self.heights, self.positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+            (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+    @property
+    def value(self):
+        if self.count == 0:
+            return 0.0
+        if self.count <= 5:
+            # Poucas amostras: quantil exato (interpolação linear, como np.quantile)
+            return float(np.quantile(self.heights, self.p))
+        return self.heights[2]
+
+    def clear(self):
+        self.__init__(self.p)
+
+
+class StreamingHistory:
+    """
+    Histórico float64 só de acréscimo com memória constante: os últimos registros ficam
+    num bloco em RAM e cada bloco cheio vai para um arquivo (temporário por padrão).
+    Aceita len(), índices e fatias (devolvem arrays), então serve direto a HistoryFile.sync
+    e a game_snapshot; a escrita de blocos e as leituras são protegidas por um lock
+    (o AutoSaver lê o histórico em outra thread).
+    """
+
+    def __init__(self, path=None, chunk=HISTORY_CHUNK):
+        self.chunk = chunk
+        self.buffer = np.zeros(chunk)
+        self._view = memoryview(self.buffer)
+        self.buffered = 0
+        self.spilled = 0
+        self._file = open(path, 'w+b') if path is not None else tempfile.TemporaryFile()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.spilled + self.buffered
+
+    def append(self, value):
+        self._view[self.buffered] = float(value)
+        self.buffered += 1
+        if self.buffered == self.chunk:
+            self._spill()
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=np.float64).reshape(-1)
+        start = 0
+        while start < len(values):
+            n = min(self.chunk - self.buffered, len(values) - start)
+            self.buffer[self.buffered:self.buffered + n] = values[start:start + n]
+            self.buffered += n
+            start += n
+            if self.buffered == self.chunk:
+                self._spill()
+
+    def _spill(self):
+        with self._lock:
+            self._file.seek(self.spilled * 8)
+            self._file.write(self.buffer[:self.buffered].astype('<f8').tobytes())
+            self._file.flush()
+            self.spilled += self.buffered
+            self.buffered = 0
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            values = self._read(start, max(stop, start))
+            return values[::step] if step != 1 else values
+        size = len(self)
+        if key < 0:
+            key += size
+        if not 0 <= key < size:
+            raise IndexError("Índice fora do histórico")
+        return float(self._read(key, key + 1)[0])
+
+    def _read(self, start, stop):
+        with self._lock:
+            spilled = self.spilled
+            stop = min(stop, spilled + self.buffered)
+            start = min(start, stop)
+            parts = []
+            if start < spilled:
+                end = min(stop, spilled)
+                self._file.seek(start * 8)
+                parts.append(np.frombuffer(self._file.read((end - start) * 8), dtype='<f8'))
+            if stop > spilled:
+                parts.append(self.buffer[max(start, spilled) - spilled:stop - spilled].copy())
+        if not parts:
+            return np.empty(0)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def tail(self, n):
+        return self[max(len(self) - n, 0):]
+
+    def to_array(self):
+        return self[:]
+
+    def clear(self):
+        with self._lock:
+            self._file.seek(0)
+            self._file.truncate()
+            self.spilled = 0
+            self.buffered = 0
+
+    def close(self):
+        self._file.close()
+
+
+class RewardStats:
+    """
+    Estatísticas das recompensas por episódio em memória constante: média e desvio da
+    janela móvel, EWMA, quantis P² e os históricos completos (recompensas e médias
+    móveis) em StreamingHistory. generation identifica o histórico atual e muda a cada
+    reset/load: cada geração é salva em arquivos de histórico próprios, então os
+    checkpoints que apontam para a anterior continuam válidos.
+    """
+
+    def __init__(self, window=100, ewma_alpha=0.01, quantiles=(0.1, 0.5, 0.9), chunk=HISTORY_CHUNK):
+        self.window = window
+        self.rolling = RollingStats(window)
+        self.ewma = EWMA(ewma_alpha)
+        self.quantiles = {p: P2Quantile(p) for p in quantiles}
+        self.rewards = StreamingHistory(chunk=chunk)
+        self.averages = StreamingHistory(chunk=chunk)
+        self.generation = new_generation()
+
+    def __len__(self):
+        return len(self.rewards)
+
+    def add(self, reward):
+        """Registra a recompensa de um episódio; retorna a média móvel da janela"""
+        reward = float(reward)
+        avg = self.rolling.add(reward)
+        self.ewma.add(reward)
+        for estimator in self.quantiles.values():
+            estimator.add(reward)
+        self.rewards.append(reward)
+        self.averages.append(avg)
+        return avg
+
+    def extend(self, rewards):
+        for reward in np.asarray(rewards, dtype=np.float64).tolist():
+            self.add(reward)
+
+    @property
+    def mean(self):
+        return self.rolling.mean
+
+    @property
+    def std(self):
+        return self.rolling.std
+
+    def quantile(self, p):
+        return self.quantiles[p].value
+
+    def load(self, rewards, averages):
+        """Restaura a partir dos históricos salvos (ex.: arrays mapeados do checkpoint)"""
+        self.reset()
+        rewards = np.asarray(rewards, dtype=np.float64)
+        self.rewards.extend(rewards)
+        self.averages.extend(averages)
+        for value in rewards[-self.window:].tolist():
+            self.rolling.add(value)
+        # EWMA sobre o histórico inteiro, em blocos vetorizados (sem laço por episódio)
+        self.ewma.value = _ewma_final(rewards, self.ewma.alpha)
+        self.quantiles = {p: P2Quantile.from_array(rewards, p) for p in self.quantiles}
+
+    def reset(self):
+        self.rolling.clear()
+        self.ewma.clear()
+        for estimator in self.quantiles.values():
+            estimator.clear()
+        # Históricos novos em vez de clear(): um snapshot ainda na fila do AutoSaver segura
+        # os antigos e precisa lê-los inteiros
+        self.rewards = StreamingHistory(chunk=self.rewards.chunk)
+        self.averages = StreamingHistory(chunk=self.averages.chunk)
+        self.generation = new_generation()
+
+    def summary(self):
+        return {
+            'episodes': len(self.rewards),
+            'mean': self.rolling.mean,
+            'std': self.rolling.std,
+            'ewma': self.ewma.value if self.ewma.value is not None else 0.0,
+            'quantiles': {p: estimator.value for p, estimator in self.quantiles.items()},
+        }
+
+    def format(self):
+        summary = self.summary()
+        quantiles = ", ".join(f"p{p * 100:g}: {value:.1f}" for p, value in summary['quantiles'].items())
+        return (f"Média ({self.window} eps): {summary['mean']:.1f} ± {summary['std']:.1f}, "
+                f"EWMA: {summary['ewma']:.1f}" + (f", {quantiles}" if quantiles else ""))
+
+    def close(self):
+        self.rewards.close()
+        self.averages.close()
+
+
+def _ewma_final(values, alpha, block=4096):
+    """Valor final de EWMA.add sobre values (None se vazio)"""
+    if len(values) == 0:
+        return None
+    value = float(values[0])
+    decay = 1.0 - alpha
+    for start in range(1, len(values), block):
+        chunk = np.asarray(values[start:start + block], dtype=np.float64)
+        weights = decay ** np.arange(len(chunk) - 1, -1, -1)
+        value = value * decay ** len(chunk) + alpha * float(np.dot(weights, chunk))
+    return value
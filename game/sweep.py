@@ -0,0 +1,284 @@
+import itertools
+import json
+import math
+import os
+import queue
+import random
+import time
+import multiprocessing as mp
+import numpy as np
+from .agent import QLearningAgent
+from .environment import Environment
+from .headless import HeadlessTrainer
+from .constants import *
+
+# Hiperparâmetros ajustáveis (mesmos nomes dos argumentos de QLearningAgent)
+PARAMS = ('alpha', 'gamma', 'epsilon', 'epsilon_min', 'epsilon_decay')
+DEFAULTS = {
+    'alpha': ALPHA,
+    'gamma': GAMMA,
+    'epsilon': EPSILON_START,
+    'epsilon_min': EPSILON_MIN,
+    'epsilon_decay': EPSILON_DECAY,
+}
+WINDOW = 100  # Episódios da média móvel (como em HeadlessTrainer)
+
+# Definidos em cada processo do pool por _init_worker
+_stop_flags = None
+_progress = None
+
+
+def parse_space(items):
+    """
+    Converte ["alpha=0.05,0.1,0.2", "gamma=0.8:0.99", "epsilon_decay=log:0.99:0.9999"]
+    no espaço de busca: lista de valores (grade) ou intervalo (low, high, log) (aleatória).
+    """
+    space = {}
+    for item in items:
+        name, _, spec = item.partition('=')
+        name = name.strip()
+        if name not in PARAMS:
+            raise ValueError(f"Hiperparâmetro desconhecido: {name} (use {', '.join(PARAMS)})")
+        log = spec.startswith('log:')
+        if log:
+            spec = spec[4:]
+        if ':' in spec:
+            low, high = (float(v) for v in spec.split(':'))
+            if log and (low <= 0 or high <= 0):
+                raise ValueError(f"Intervalo logarítmico precisa ser positivo: {item}")
+            space[name] = (low, high, log)
+        else:
+            space[name] = [float(v) for v in spec.split(',')]
+    return space
+
+
+def grid_configs(space):
+    """Produto cartesiano das listas de valores (intervalos não são aceitos na grade)"""
+    for name, values in space.items():
+        if not isinstance(values, list):
+            raise ValueError(f"Busca em grade precisa de uma lista de valores para {name}")
+    names = list(space)
+    return [dict(DEFAULTS, **dict(zip(names, values)))
+            for values in itertools.product(*(space[name] for name in names))]
+
+
+def random_configs(space, count, seed=None):
+    """count configurações sorteadas: listas por escolha, intervalos uniformes ou log-uniformes"""
+    rng = random.Random(seed)
+    configs = []
+    for _ in range(count):
+        config = dict(DEFAULTS)
+        for name, values in space.items():
+            if isinstance(values, list):
+                config[name] = rng.choice(values)
+            else:
+                low, high, log = values
+                config[name] = (math.exp(rng.uniform(math.log(low), math.log(high))) if log
+                                else rng.uniform(low, high))
+        configs.append(config)
+    return configs
+
+
+def _init_worker(stop_flags, progress):
+    global _stop_flags, _progress
+    _stop_flags = stop_flags
+    _progress = progress
+
+
+def run_job(job_id, config, seed, episodes, threshold, report_every):
+    """
+    Um treino headless independente (agente denso novo) com orçamento fixo de episódios.
+    A cada report_every episódios envia a média móvel ao processo principal e para
+    se a flag compartilhada do job foi ligada (configuração claramente perdedora).
+    """
+    random.seed(seed)  # Labirintos e exploração reprodutíveis por seed
+    agent = QLearningAgent(storage="dense", **config)
+    agent.rng = np.random.default_rng(seed)
+    trainer = HeadlessTrainer(env=Environment(agent))
+    episodes_to_threshold = None
+    stopped = False
+    start = time.perf_counter()
+
+    while trainer.episodes < episodes:
+        trainer.run_episode()
+        if episodes_to_threshold is None and trainer.episodes >= WINDOW and \
+                trainer.reward_stats.mean >= threshold:
+            episodes_to_threshold = trainer.episodes
+        if report_every and trainer.episodes % report_every == 0 and trainer.episodes < episodes:
+            if _progress is not None:
+                _progress.put((job_id, trainer.episodes, trainer.reward_stats.mean))
+            if _stop_flags is not None and _stop_flags[job_id]:
+                stopped = True
+                break
+
+    return {
+        'job': job_id,
+        'config': config,
+        'seed': seed,
+        'episodes': trainer.episodes,
+        'final_avg': trainer.reward_stats.mean,
+        'episodes_to_threshold': episodes_to_threshold,
+        'stopped': stopped,
+        'elapsed': time.perf_counter() - start,
+    }
+
+
+class Sweep:
+    """
+    Roda configs x seeds treinos headless independentes num pool de processos e
+    junta os resultados numa tabela. Poda pela regra da mediana: depois de
+    grace * episodes episódios, um job cuja média móvel fica mais de kill_margin abaixo
+    do quantil kill_quantile dos outros jobs no mesmo ponto (com pelo menos min_peers)
+    é parado.
+    """
+
+    def __init__(self, configs, episodes=2000, seeds=(0,), workers=None, threshold=30.0,
+                 report_every=100, grace=0.25, kill_quantile=0.25, kill_margin=5.0, min_peers=3):
+        self.configs = configs
+        self.episodes = episodes
+        self.seeds = list(seeds)
+        self.workers = workers or os.cpu_count() or 1
+        self.threshold = threshold
+        self.report_every = report_every
+        self.grace = grace
+        self.kill_quantile = kill_quantile  # None desativa a poda
+        self.kill_margin = kill_margin  # Folga (em recompensa) para não parar quem está empatado
+        self.min_peers = min_peers
+        self.jobs = [(config_id, seed) for config_id in range(len(configs)) for seed in self.seeds]
+        self.curves = [{} for _ in self.jobs]  # job -> {episódio: média móvel}
+        self.results = []
+        self.killed = 0
+
+    def should_stop(self, job_id, episode, avg):
+        if self.kill_quantile is None or episode < self.grace * self.episodes:
+            return False
+        peers = [curve[episode] for j, curve in enumerate(self.curves)
+                 if j != job_id and episode in curve]
+        if len(peers) < self.min_peers:
+            return False
+        return avg < np.quantile(peers, self.kill_quantile) - self.kill_margin
+
+    def run(self, log=True):
+        stop_flags = mp.RawArray('b', len(self.jobs))
+        progress = mp.Queue()
+        pool = mp.Pool(self.workers, initializer=_init_worker, initargs=(stop_flags, progress))
+        start = time.perf_counter()
+        if log:
+            print(f"Sweep: {len(self.configs)} configurações x {len(self.seeds)} seeds, "
+                  f"{self.episodes} episódios cada, {self.workers} workers")
+            print(self._header())
+        try:
+            pending = {
+                job_id: pool.apply_async(run_job, (job_id, self.configs[config_id], seed, self.episodes,
+                                                   self.threshold, self.report_every))
+                for job_id, (config_id, seed) in enumerate(self.jobs)
+            }
+            while pending:
+                try:
+                    job_id, episode, avg = progress.get(timeout=0.1)
+                    self.curves[job_id][episode] = avg
+                    if not stop_flags[job_id] and self.should_stop(job_id, episode, avg):
+                        stop_flags[job_id] = 1
+                        self.killed += 1
+                except queue.Empty:
+                    pass
+                for job_id in [j for j, result in pending.items() if result.ready()]:
+                    result = pending.pop(job_id).get()
+                    self.results.append(result)
+                    if log:
+                        print(self._row(result))
+        finally:
+            pool.terminate()
+            pool.join()
+
+        elapsed = time.perf_counter() - start
+        if log:
+            print(f"Sweep concluído em {elapsed:.1f}s ({self.killed} jobs parados antes do fim)")
+            print(format_summary(self.summary(), self.threshold))
+        return self.summary()
+
+    def summary(self):
+        """Uma linha por configuração (médias entre as seeds), da melhor para a pior"""
+        rows = []
+        for config_id, config in enumerate(self.configs):
+            results = [r for r in self.results if self.jobs[r['job']][0] == config_id]
+            if not results:
+                continue
+            reached = [r['episodes_to_threshold'] for r in results if r['episodes_to_threshold'] is not None]
+            rows.append({
+                'config': config,
+                'runs': len(results),
+                'stopped': sum(r['stopped'] for r in results),
+                'final_avg': sum(r['final_avg'] for r in results) / len(results),
+                'reached': len(reached),
+                'episodes_to_threshold': sum(reached) / len(reached) if reached else None,
+            })
+        # Configurações completas primeiro; depois pela média final
+        rows.sort(key=lambda row: (row['stopped'] == row['runs'], -row['final_avg']))
+        return rows
+
+    def _header(self):
+        return "  ".join(f"{name:>13}" for name in PARAMS) + f"  {'seed':>6}  {'episódios':>9}  {'média':>7}  {'limiar em':>9}"
+
+    def _row(self, result):
+        values = "  ".join(f"{result['config'][name]:>13.6g}" for name in PARAMS)
+        reached = result['episodes_to_threshold']
+        status = " (parado)" if result['stopped'] else ""
+        return (f"{values}  {result['seed']:>6}  {result['episodes']:>9}  {result['final_avg']:>7.1f}  "
+                f"{reached if reached is not None else '-':>9}{status}")
+
+
+def format_summary(rows, threshold):
+    lines = ["  ".join(f"{name:>13}" for name in PARAMS) +
+             f"  {'média final':>11}  {f'eps até {threshold:g}':>12}  {'atingiu':>7}  {'parados':>7}"]
+    for row in rows:
+        values = "  ".join(f"{row['config'][name]:>13.6g}" for name in PARAMS)
+        reached = row['episodes_to_threshold']
+        lines.append(f"{values}  {row['final_avg']:>11.1f}  "
+                     f"{f'{reached:.0f}' if reached is not None else '-':>12}  "
+                     f"{row['reached']:>3}/{row['runs']:<3}  {row['stopped']:>3}/{row['runs']:<3}")
+    return "\n".join(lines)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Busca de hiperparâmetros em paralelo (treinos headless)")
+    parser.add_argument("params", nargs="+",
+                        help="Espaço de busca: alpha=0.05,0.1,0.2 (valores) ou gamma=0.8:0.99 / "
+                             "epsilon_decay=log:0.99:0.9999 (intervalos, só com --random)")
+    parser.add_argument("--random", type=int, default=0,
+                        help="Sorteia N configurações (busca aleatória) em vez da grade completa")
+    parser.add_argument("--episodes", type=int, default=2000, help="Orçamento de episódios por treino")
+    parser.add_argument("--seeds", type=int, default=3, help="Seeds por configuração")
+    parser.add_argument("--seed", type=int, default=0, help="Primeira seed (e seed da busca aleatória)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threshold", type=float, default=30.0,
+                        help="Média móvel (100 eps) usada em episódios até o limiar")
+    parser.add_argument("--report-every", type=int, default=100)
+    parser.add_argument("--grace", type=float, default=0.25,
+                        help="Fração do orçamento antes de começar a parar configurações")
+    parser.add_argument("--kill-quantile", type=float, default=0.25,
+                        help="Para jobs abaixo deste quantil dos demais no mesmo episódio")
+    parser.add_argument("--kill-margin", type=float, default=5.0,
+                        help="Folga abaixo do quantil antes de parar (em recompensa média)")
+    parser.add_argument("--no-kill", action="store_true", help="Desativa a parada antecipada")
+    parser.add_argument("--output", default=None, help="Salva o resumo em JSON")
+    args = parser.parse_args()
+
+    space = parse_space(args.params)
+    configs = random_configs(space, args.random, args.seed) if args.random else grid_configs(space)
+    sweep = Sweep(configs, episodes=args.episodes, seeds=range(args.seed, args.seed + args.seeds),
+                  workers=args.workers, threshold=args.threshold, report_every=args.report_every,
+                  grace=args.grace, kill_quantile=None if args.no_kill else args.kill_quantile,
+                  kill_margin=args.kill_margin)
+    rows = sweep.run()
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({'threshold': args.threshold, 'episodes': args.episodes, 'results': sweep.results,
+                       'summary': rows}, f, indent=2)
+        print(f"Resultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import mmap
+import struct
+from collections import namedtuple
+from pathlib import Path
+import numpy as np
+from .roadmap import RoadMap, MazeSpec
+from .checkpoint import pack_grid, unpack_grid
+from .constants import RECORD_EVERY, TRAJECTORY_PATH
+
+# Log só de acréscimo: magic (8 bytes) e registros
+#   tamanho do registro | episódio | seed (-1: grid incluído) | linhas | colunas | início (linha, coluna)
+#   | nº de checkpoints | recompensa total | nº de ações | checkpoints (linha, coluna)
+#   | grid em bits (só sem seed) | ações (uint8)
+MAGIC = b"IATRAJ\x00\x01"
+_HEADER = struct.Struct("<IQqIIIIIdI")
+_POINT = struct.Struct("<II")
+
+Trajectory = namedtuple("Trajectory", ["episode", "seed", "grid", "checkpoints", "start_pos",
+                                       "actions", "total_reward"])
+
+
+def encode_trajectory(episode, roadmap, actions, total_reward):
+    """Bytes de um registro; labirintos com seed guardam só a seed (o grid é regenerado)"""
+    seed = roadmap.seed if roadmap.seed is not None else -1
+    actions = np.asarray(actions, dtype=np.uint8)
+    checkpoints = b"".join(_POINT.pack(*cp) for cp in roadmap.checkpoints)
+    grid = pack_grid(roadmap.grid).tobytes() if seed < 0 else b""
+    size = _HEADER.size + len(checkpoints) + len(grid) + actions.nbytes
+    header = _HEADER.pack(size, episode, seed, roadmap.rows, roadmap.cols, *roadmap.start_pos,
+                          len(roadmap.checkpoints), float(total_reward), len(actions))
+    return header + checkpoints + grid + actions.tobytes()
+
+
+def decode_trajectory(data):
+    (_, episode, seed, rows, cols, start_row, start_col, num_checkpoints,
+     total_reward, num_actions) = _HEADER.unpack_from(data)
+    offset = _HEADER.size
+    checkpoints = [_POINT.unpack_from(data, offset + i * _POINT.size) for i in range(num_checkpoints)]
+    offset += num_checkpoints * _POINT.size
+    if seed < 0:
+        packed_len = (rows * cols + 7) // 8
+        grid = unpack_grid(np.frombuffer(data, dtype=np.uint8, count=packed_len, offset=offset), (rows, cols))
+        offset += packed_len
+        seed = None
+    else:
+        grid = RoadMap(seed=seed, rows=rows, cols=cols).grid
+    actions = np.frombuffer(data, dtype=np.uint8, count=num_actions, offset=offset).copy()
+    return Trajectory(episode, seed, grid, checkpoints, (start_row, start_col), actions, total_reward)
+
+
+def trajectory_roadmap(trajectory):
+    """RoadMap do episódio gravado (checkpoints e início exatamente como no treino)"""
+    roadmap = RoadMap.from_spec(MazeSpec(trajectory.grid, trajectory.checkpoints, trajectory.start_pos))
+    roadmap.seed = trajectory.seed
+    return roadmap
+
+
+def _complete_length(path):
+    """Bytes do log até o fim do último registro completo (0 se nem o magic está completo)"""
+    with open(path, 'rb') as f:
+        data = f.read(len(MAGIC))
+        if len(data) < len(MAGIC):
+            return 0
+        if data != MAGIC:
+            raise ValueError(f"{path} não é um log de trajetórias")
+        size = f.seek(0, 2)
+        offset = len(MAGIC)
+        while offset + _HEADER.size <= size:
+            f.seek(offset)
+            record = struct.unpack("<I", f.read(4))[0]
+            if record < _HEADER.size or offset + record > size:
+                break
+            offset += record
+        return offset
+
+
+class TrajectoryRecorder:
+    """
+    Grava um episódio a cada `every` (ações em uint8 + labirinto compacto) num log
+    só de acréscimo. O treino só acumula as ações dos episódios escolhidos; cada
+    registro é escrito de uma vez, então uma queda deixa no máximo um registro
+    incompleto no fim, que o leitor ignora e que é descartado ao reabrir o log
+    (senão os registros acrescentados depois dele ficariam ilegíveis).
+    """
+
+    def __init__(self, path=TRAJECTORY_PATH, every=RECORD_EVERY):
+        self.path = Path(path)
+        self.every = every
+        self.recorded = 0
+        self.bytes_written = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'ab')
+        end = _complete_length(self.path)
+        if end < self._file.tell():
+            self._file.truncate(end)
+        if end == 0:
+            self._file.write(MAGIC)
+
+    def wants(self, episode):
+        return bool(self.every) and episode % self.every == 0
+
+    def record(self, episode, roadmap, actions, total_reward):
+        data = encode_trajectory(episode, roadmap, actions, total_reward)
+        self._file.write(data)
+        self._file.flush()
+        self.recorded += 1
+        self.bytes_written += len(data)
+
+    def close(self):
+        self._file.close()
+
+
+class TrajectoryLog:
+    """Leitura do log mapeado em memória: índice de offsets montado uma vez; log[i] decodifica o i-ésimo registro"""
+
+    def __init__(self, path=TRAJECTORY_PATH):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} não é um log de trajetórias")
+        self.offsets = []
+        self.episodes = []
+        offset = len(MAGIC)
+        while offset + _HEADER.size <= len(self.data):
+            size, episode = struct.unpack_from("<IQ", self.data, offset)
+            if offset + size > len(self.data):
+                break  # Registro incompleto no fim (queda durante a escrita)
+            self.offsets.append(offset)
+            self.episodes.append(episode)
+            offset += size
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        offset = self.offsets[index]
+        size = struct.unpack_from("<I", self.data, offset)[0]
+        with memoryview(self.data) as view:
+            return decode_trajectory(view[offset:offset + size])
+
+    def find(self, episode):
+        """Índice do registro do episódio (ou do primeiro gravado depois dele)"""
+        for i, recorded in enumerate(self.episodes):
+            if recorded >= episode:
+                return i
+        return len(self.offsets) - 1
+
+    def close(self):
+        self.data.close()
@@ -0,0 +1,164 @@
+import time
+import numpy as np
+from .roadmap import RoadMap
+from .agent import QLearningAgent
+from .environment import ACTION_DR, ACTION_DC, MAX_EPISODE_STEPS
+from .constants import *
+from .stats import RewardStats
+
+MAX_CHECKPOINTS = 3
+ACTION_DELTAS = np.stack([ACTION_DR, ACTION_DC], axis=1)
+
+
+class VectorEnvironment:
+    """N labirintos simulados em paralelo com operações vetorizadas do NumPy"""
+
+    def __init__(self, num_envs, maze_source=None, rows=ROWS, cols=COLS):
+        self.num_envs = num_envs
+        self.maze_source = maze_source
+        self.rows, self.cols = rows, cols  # Todos os labirintos do lote têm o mesmo tamanho
+        self.grids = np.zeros((num_envs, rows, cols), dtype=np.uint8)
+        self.positions = np.zeros((num_envs, 2), dtype=np.int64)
+        self.checkpoints = np.zeros((num_envs, MAX_CHECKPOINTS, 2), dtype=np.int64)
+        self.num_checkpoints = np.zeros(num_envs, dtype=np.int64)
+        self.current_checkpoint = np.zeros(num_envs, dtype=np.int64)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self.episode_rewards = np.zeros(num_envs, dtype=np.float64)
+        self.done = np.zeros(num_envs, dtype=bool)
+        self._env_index = np.arange(num_envs)
+
+    def load_roadmap(self, i, roadmap):
+        """Copia um RoadMap para a posição i do lote"""
+        self.grids[i] = roadmap.grid
+        checkpoints = roadmap.checkpoints[:MAX_CHECKPOINTS]
+        self.num_checkpoints[i] = len(checkpoints)
+        if checkpoints:
+            self.checkpoints[i, :len(checkpoints)] = checkpoints
+        self.positions[i] = roadmap.start_pos
+        self.current_checkpoint[i] = 0
+        self.steps[i] = 0
+        self.episode_rewards[i] = 0.0
+        self.done[i] = False
+
+    def reset(self, indices=None):
+        if indices is None:
+            indices = self._env_index
+        for i in indices:
+            roadmap = self.maze_source.next_roadmap() if self.maze_source is not None else \
+                RoadMap(rows=self.rows, cols=self.cols)
+            self.load_roadmap(i, roadmap)
+        return self.get_states()
+
+    def get_states(self):
+        """Mesma codificação de QLearningAgent.get_state_key, como array (N, 2) de (dx, dy)"""
+        has_cp = self.num_checkpoints > 0
+        current = np.minimum(self.current_checkpoint, np.maximum(self.num_checkpoints - 1, 0))
+        target = self.checkpoints[self._env_index, current]
+        states = np.empty((self.num_envs, 2), dtype=np.int64)
+        np.clip(target[:, 1] - self.positions[:, 1], -5, 5, out=states[:, 0])
+        np.clip(target[:, 0] - self.positions[:, 0], -5, 5, out=states[:, 1])
+        states[~has_cp] = 0
+        return states
+
+    def step(self, actions, auto_reset=True):
+        """
+        Avança todos os ambientes um passo.
+        Retorna (next_states, rewards, dones, finished_rewards): next_states são os
+        estados antes do auto-reset (para o aprendizado) e finished_rewards traz a
+        recompensa total de cada episódio encerrado neste passo.
+        Com auto_reset=False os ambientes encerrados ficam congelados (done=True,
+        recompensa 0) até um reset explícito, como na avaliação.
+        """
+        idx = self._env_index
+        new_pos = self.positions + ACTION_DELTAS[actions]
+        rows, cols = new_pos[:, 0], new_pos[:, 1]
+
+        # Verificar se o movimento é válido (dentro do mapa e sobre estrada)
+        inside = (rows >= 0) & (rows < self.rows) & (cols >= 0) & (cols < self.cols)
+        valid = inside.copy()
+        valid[inside] = self.grids[idx[inside], rows[inside], cols[inside]] == 1
+
+        rewards = np.where(valid, -0.1, -10.0)
+        if not auto_reset:
+            frozen = self.done.copy()
+            valid &= ~frozen
+        self.positions[valid] = new_pos[valid]
+        self.steps += valid
+
+        # Checkpoints alcançados
+        has_cp = self.num_checkpoints > 0
+        current = np.minimum(self.current_checkpoint, np.maximum(self.num_checkpoints - 1, 0))
+        target = self.checkpoints[idx, current]
+        hit = valid & has_cp & (self.positions == target).all(axis=1)
+        rewards[hit] = 10.0
+        self.current_checkpoint += hit
+        completed = hit & (self.current_checkpoint >= self.num_checkpoints)
+        rewards[completed] = 20.0
+
+        dones = ~valid | completed
+        if not auto_reset:
+            rewards[frozen] = 0.0
+            dones &= ~frozen
+        self.episode_rewards += rewards
+        next_states = self.get_states()
+
+        # Auto-reset dos ambientes que terminaram (ou atingiram o limite de passos)
+        finished = dones | (self.steps >= MAX_EPISODE_STEPS)
+        if not auto_reset:
+            finished &= ~frozen
+            self.done = finished | frozen
+            return next_states, rewards, dones, self.episode_rewards[finished].copy()
+        self.done = finished
+        finished_idx = np.flatnonzero(finished)
+        finished_rewards = self.episode_rewards[finished_idx].copy()
+        if finished_idx.size:
+            self.reset(finished_idx)
+
+        return next_states, rewards, dones, finished_rewards
+
+
+class VectorTrainer:
+    """Treinamento headless alimentando o agente com lotes de transições"""
+
+    def __init__(self, num_envs=256, agent=None, maze_source=None, rows=None, cols=None):
+        # Sem rows/cols explícitos, usa o tamanho informado pela fonte (MazePool, SeededMazes...)
+        rows = rows if rows is not None else getattr(maze_source, 'rows', ROWS)
+        cols = cols if cols is not None else getattr(maze_source, 'cols', COLS)
+        self.env = VectorEnvironment(num_envs, maze_source, rows, cols)
+        self.agent = agent if agent is not None else QLearningAgent(storage="dense")
+        self.episodes = 0
+        self.total_steps = 0
+        self.reward_stats = RewardStats()
+
+    def train(self, episodes=10000, log_every=1000):
+        agent = self.agent
+        env = self.env
+        states = env.reset()
+        target = self.episodes + episodes
+        next_log = self.episodes + log_every if log_every else None
+        start = time.perf_counter()
+        start_steps = self.total_steps
+
+        while self.episodes < target:
+            actions = agent.choose_actions(states)
+            next_states, rewards, dones, finished_rewards = env.step(actions)
+            # Média por par (estado, ação): somar os erros repetidos do lote diverge
+            agent.learn_batch(states, actions, rewards, next_states, average=True)
+            states = env.get_states()
+            self.total_steps += env.num_envs
+
+            # Epsilon decai uma vez por episódio encerrado
+            for reward in finished_rewards:
+                agent.decay_epsilon()
+                self.reward_stats.add(reward)
+            self.episodes += len(finished_rewards)
+
+            if next_log is not None and self.episodes >= next_log:
+                elapsed = time.perf_counter() - start
+                print(f"Episódio: {self.episodes}, {self.reward_stats.format()}, "
+                      f"Epsilon: {agent.epsilon:.2f}, Passos/s: {(self.total_steps - start_steps) / elapsed:.0f}")
+                next_log += log_every
+
+        elapsed = time.perf_counter() - start
+        print(f"Treinamento vetorizado concluído: {self.episodes} episódios em {elapsed:.1f}s")
+        return elapsed
@@ -6,8 +6,7 @@ from game.game import Game
 def handle_exit(signum, frame):
     """Handler para encerramento limpo"""
     print("\nSalvando progresso antes de sair...")
-    game.save_game()
-    game.agent.save_model()
+    game.save_game()  # Grava também save/q_learning_model.ckpt (mesmo snapshot)
     game.close()
     pygame.quit()
     sys.exit(0)
@@ -17,16 +16,19 @@ def main():
     
     print("Pressione Ctrl+C para sair a qualquer momento.")
     print("Pressione 'S' para salvar o jogo ou 'L' para carregar um jogo salvo.")
+    print("'I' liga/desliga a instrumentação; 'P' e 'M' perfilam CPU e memória.")
     
     # Configurar handler para Ctrl+C
     signal.signal(signal.SIGINT, handle_exit)
     
     pygame.init()
     game = Game()
+    game.enable_autosave()
+    game.enable_recording()  # Um episódio a cada 100 em save/trajectories.traj (python -m game.replay_viewer)
     
     try:
-        # Tenta carregar um jogo existente
-        if not game.load_game():
+        # Tenta carregar um jogo existente (ou o último salvamento automático, se mais novo)
+        if not game.resume():
             print("Iniciando novo jogo...")
             game.train(episodes=1000)
     except Exception as e:
@@ -34,27 +36,32 @@ def main():
         game.train(episodes=1000)
     
     try:
-        running = True
-        while running:
-            # Processar eventos primeiro
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_s:  # Tecla S para salvar
-                        game.save_game()
-                        game.agent.save_model()
-                        print("Jogo salvo manualmente!")
-                    elif event.key == pygame.K_l:  # Tecla L para carregar
-                        if game.load_game():
-                            game.agent.load_model()
+        while game.running:
+            # Processar eventos primeiro (teclas capturadas durante os episódios também)
+            game.pump_events()
+            keys, game.key_events = game.key_events, []
+            for key in keys:
+                if key == pygame.K_s:  # Tecla S para salvar
+                    game.save_game()
+                    print("Jogo salvo manualmente!")
+                elif key == pygame.K_l:  # Tecla L para carregar (restaura também a Q-table)
+                    game.load_game()
+                elif key == pygame.K_i:  # Tecla I liga/desliga os cronômetros por fase
+                    if game.instrumentation is None:
+                        game.enable_instrumentation()
+                        print("Instrumentação ativada")
+                    else:
+                        print(f"Instrumentação desativada: {game.disable_instrumentation().format()}")
+                elif key == pygame.K_p:  # Tecla P perfila os próximos episódios (cProfile)
+                    game.profile_episodes(kind="cprofile")
+                elif key == pygame.K_m:  # Tecla M perfila a memória (tracemalloc)
+                    game.profile_episodes(kind="tracemalloc")
                         
-            if not running:
+            if not game.running:
                 break
                 
-            # Executar episódio
+            # Executar episódio (renderização limitada a RENDER_FPS, simulação em velocidade máxima)
             game.run_episode(render=True)
-            game.clock.tick(120)
             
     except KeyboardInterrupt:
         print("\nInterrupção recebida, salvando...")
@@ -64,7 +71,6 @@ def main():
         # Garante que o salvamento ocorra mesmo com erros
         print("Salvando progresso antes de sair...")
         game.save_game()
-        game.agent.save_model()
         game.close()
         pygame.quit()
 
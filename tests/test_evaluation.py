@@ -0,0 +1,21 @@
+from game.agent import QLearningAgent
+from game.evaluation import evaluate
+from game.maze_dataset import MazeDataset, build_dataset
+
+
+def test_evaluate_dataset_with_non_default_size(tmp_path):
+    # Labirintos 50x50 (a janela usa 30x30): o lote deve seguir o tamanho do conjunto
+    path = tmp_path / "mazes.dataset"
+    build_dataset(path, count=40, rows=50, cols=50, seed=7, test_fraction=0.5, workers=1)
+    dataset = MazeDataset(path, split="test")
+
+    report = evaluate(QLearningAgent(storage="dense"), num_mazes=100, batch_size=8, dataset=dataset)
+
+    assert report['episodes'] == 20
+    assert abs(report['success_rate'] + report['wall_hit_rate'] + report['timeout_rate'] - 1.0) < 1e-9
+
+
+def test_evaluate_seeded_mazes_with_non_default_size():
+    report = evaluate(QLearningAgent(storage="dense"), num_mazes=10, rows=45, cols=20)
+
+    assert report['episodes'] == 10